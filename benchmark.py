@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import draw_events
+import exports
+import history_store
+from draw_engine import draw_all_groups, run_draw
+from draw_state import DrawState, STATUS_READY
+
+# ----------------------------------------------------
+# *** Benchmark แบบ headless (ไม่ต้องเปิด Streamlit) ***
+# ----------------------------------------------------
+# python benchmark.py --sizes 1000 10000 100000 1000000 --output bench.json
+# สร้างรายชื่อ/ของรางวัลจำลองในโฟลเดอร์ชั่วคราว แล้วจับเวลาทุกขั้นตอนของการสุ่มหนึ่งรอบ
+# ผลลัพธ์เป็น JSON (วินาทีต่อขั้นตอน) เพื่อเทียบระหว่างเวอร์ชัน
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# สัดส่วนผู้ได้รางวัลต่อจำนวนพนักงาน และจำนวนชิ้นต่อรายการของขวัญ
+WINNER_RATIO = 0.1
+PRIZE_QUANTITY = 10
+# Excel ใหญ่กว่านี้ใช้เวลานานมาก: ข้าม (ระบุ --formats xlsx เพื่อบังคับ)
+EXCEL_MAX_ROWS = 100_000
+
+GROUPS = ['อายุงานไม่ถึง 1 ปี', 'อายุงาน 1-5 ปี', 'อายุงาน 6-10 ปี',
+          'อายุงาน 11-15 ปี', 'อายุงาน 16-20 ปี', 'อายุงาน 20 ปีขึ้นไป']
+DEPARTMENTS = ['Sale&Marketing', 'ดิจิตอล', 'บัญชี', 'การเงิน', 'บุคคล', 'ผลิต', 'คลังสินค้า', 'จัดซื้อ', 'ไอที', 'ขนส่ง']
+FIRST_NAMES = ['ธนกร', 'ธนวันต์', 'สมชาย', 'สมหญิง', 'กิตติพัฒน์', 'ณัฐวุฒิ', 'ปิยะพงษ์', 'วราภรณ์', 'สุดารัตน์', 'อรทัย',
+               'ชนิดา', 'พิมพ์ชนก', 'ศุภชัย', 'อนุชา', 'จิราพร', 'ธีรพงษ์', 'นภัสสร', 'ปวีณา', 'รัตนา', 'วีระ',
+               'สุรเชษฐ์', 'อภิชาติ', 'กมลชนก', 'เกศินี', 'ชยพล', 'ทรงศักดิ์', 'นันทนา', 'บุษบา', 'พงศกร', 'มาลัย',
+               'ยุทธนา', 'ลัดดา', 'วิไลวรรณ', 'ศิริพร', 'สุภาพร', 'อัญชลี', 'เอกชัย', 'ไพโรจน์', 'กัญญา', 'จักรพันธ์']
+SYLLABLES = ['แก้ว', 'มงคล', 'สนธิ', 'กุล', 'ศรี', 'สุข', 'ทอง', 'วงศ์', 'ชัย', 'ประเสริฐ', 'บุญ', 'มี', 'เจริญ', 'รุ่ง',
+             'เรือง', 'พันธ์', 'สวัสดิ์', 'ดี', 'ใจ', 'งาม', 'รักษ์', 'ไทย', 'นาค', 'พงษ์', 'สิทธิ์', 'เพชร', 'จันทร์',
+             'แสง', 'ทิพย์', 'ภักดี']
+
+# ----------------------------------------------------
+# *** ข้อมูลจำลอง ***
+# ----------------------------------------------------
+def make_roster(rows, rng):
+    """พนักงานจำลอง rows คน (ชื่อไม่ซ้ำ: ชื่อต้น x นามสกุลสามพยางค์)"""
+    n_syl = len(SYLLABLES)
+    combos = len(FIRST_NAMES) * n_syl ** 3
+    if rows > combos:
+        raise ValueError(f"สร้างชื่อไม่ซ้ำได้สูงสุด {combos} คน")
+    codes = rng.choice(combos, size=rows, replace=False)
+    first, rest = np.divmod(codes, n_syl ** 3)
+    syl = np.asarray(SYLLABLES, dtype=object)
+    last = syl[rest // n_syl ** 2] + syl[(rest // n_syl) % n_syl] + syl[rest % n_syl]
+    names = np.asarray(FIRST_NAMES, dtype=object)[first] + '  ' + last
+    return pd.DataFrame({
+        'ชื่อ-นามสกุล': names,
+        'แผนก': np.asarray(DEPARTMENTS, dtype=object)[rng.integers(len(DEPARTMENTS), size=rows)],
+        'กลุ่มจับรางวัล': np.asarray(GROUPS, dtype=object)[rng.integers(len(GROUPS), size=rows)],
+        'สถานะ': STATUS_READY,
+    })
+
+def make_prizes(rows, rng):
+    """ของรางวัลจำลอง: รวมประมาณ rows * WINNER_RATIO ชิ้น รายการละ PRIZE_QUANTITY ชิ้น"""
+    items = max(len(GROUPS), int(rows * WINNER_RATIO) // PRIZE_QUANTITY)
+    return pd.DataFrame({
+        'ชื่อของขวัญ': [f"[หมายเลข {i + 1}] ของรางวัล" for i in range(items)],
+        'กลุ่มจับรางวัล': np.asarray(GROUPS, dtype=object)[np.arange(items) % len(GROUPS)],
+        'จำนวนคงเหลือ': PRIZE_QUANTITY,
+    })
+
+# ----------------------------------------------------
+# *** จับเวลา ***
+# ----------------------------------------------------
+class Timings:
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - start, 6)
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def bench_size(rows, formats, seed, excel_max_rows=EXCEL_MAX_ROWS):
+    """จับเวลาทุกขั้นตอนสำหรับรายชื่อ rows คน (ต้องเรียกใน working directory ชั่วคราว)"""
+    rng = np.random.default_rng(seed)
+    make_roster(rows, rng).to_csv(data_store.EMPLOYEE_FILE, index=False, encoding='utf_8_sig')
+    make_prizes(rows, rng).to_csv(data_store.PRIZE_FILE, index=False, encoding='utf_8_sig')
+    history_store.clear_history()
+    draw_events.reset()
+    data_store.clear_cache()
+    t = Timings()
+
+    # โหลด: parse CSV ครั้งแรก (เขียน snapshot) แล้วโหลดซ้ำจาก snapshot
+    for path in (data_store.EMPLOYEE_FILE, data_store.PRIZE_FILE):
+        _remove(data_store.snapshot_path(path))
+    with t.stage('load_csv'):
+        emp_df, prize_df = data_store.load_employees(), data_store.load_prizes()
+    data_store.clear_cache()
+    with t.stage('load_snapshot'):
+        data_store.load_employees(), data_store.load_prizes()
+
+    total_prizes = int(prize_df['จำนวนคงเหลือ'].sum())
+    with t.stage('index'):
+        state = DrawState(emp_df, prize_df)
+
+    # กรอง: อ่าน pool ที่เตรียมไว้ของทุกกลุ่ม (เหมือนที่ run_draw ทำ)
+    with t.stage('filter'):
+        for group in GROUPS:
+            state.available_ids(group)
+            state.available_prizes(group)
+
+    with t.stage('sample_per_group'):
+        winners = sum(len(run_draw(group, state, rng=np.random.default_rng(seed))) for group in GROUPS)
+    with t.stage('sample_batch'):
+        results = draw_all_groups(emp_df, prize_df, STATUS_READY, rng=np.random.default_rng(seed))
+
+    with t.stage('commit'):
+        state.mark_winners(results)
+
+    keys = state.roster_keys(results['emp_id'])
+    records = results[history_store.HISTORY_COLUMNS].assign(**keys, _seed=seed, _draw_no=0, _batch=1).to_dict('records')
+    with t.stage('persist'):
+        history_store.append_records(0, records)
+        history_store.compact(records)
+
+    with t.stage('summarize'):
+        index = data_store.load_results_index()
+        summary = pd.concat([index[g] for g in sorted(index)], ignore_index=True) if index else pd.DataFrame()
+
+    for fmt in formats:
+        if fmt == 'xlsx' and excel_max_rows is not None and len(summary) > excel_max_rows:
+            continue
+        with t.stage(f'export_{fmt}'):
+            exports.BUILDERS[fmt](summary)
+
+    return {'rows': rows, 'prizes': total_prizes, 'winners': len(results),
+            'winners_per_group_draw': winners, 'stages': t.stages}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark การสุ่มรางวัลแบบ headless (ผลลัพธ์เป็น JSON)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="จำนวนพนักงานแต่ละรอบ")
+    parser.add_argument('--formats', nargs='+', default=None, choices=sorted(exports.BUILDERS),
+                        help="รูปแบบไฟล์ส่งออกที่จับเวลา (ค่าเริ่มต้น: ทุกแบบที่ติดตั้งได้)")
+    parser.add_argument('--seed', type=int, default=2569)
+    parser.add_argument('--output', help="เขียน JSON ลงไฟล์นี้ (ค่าเริ่มต้น: stdout)")
+    args = parser.parse_args(argv)
+
+    formats = args.formats or [fmt for fmt, _ in exports.EXPORT_FORMATS.values()]
+    # ระบุ --formats เอง: จับเวลาทุกขนาดตามที่ขอ ไม่ข้าม Excel ขนาดใหญ่
+    excel_max_rows = None if args.formats else EXCEL_MAX_ROWS
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': [],
+    }
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='draw-bench-') as workdir:
+        os.chdir(workdir)
+        try:
+            for rows in args.sizes:
+                print(f"benchmark: {rows:,} คน ...", file=sys.stderr)
+                report['results'].append(bench_size(rows, formats, args.seed, excel_max_rows))
+        finally:
+            os.chdir(cwd)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+import codecs
+import io
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # ไม่มี pyarrow: อ่านจาก CSV อย่างเดียว
+    pa = None
+    feather = None
+
+import draw_events
+import history_store
+import instrumentation
+from draw_state import STATUS_READY, STATUS_WON
+
+# ----------------------------------------------------
+# --- CONFIGURATION & FILE PATHS ---
+# ----------------------------------------------------
+EMPLOYEE_FILE = 'employees.csv'
+PRIZE_FILE = 'prizes.csv'
+HISTORY_FILE = history_store.HISTORY_FILE
+
+# snapshot แบบ columnar (Arrow/Feather ไม่บีบอัด เพื่อ memory-map ได้) เก็บข้างไฟล์ CSV
+SNAPSHOT_SUFFIX = '.feather'
+SNAPSHOT_SIGNATURE_KEY = b'source_signature'
+
+# อ่านส่วนหัวไฟล์เท่านี้เพื่อเดา encoding (BOM / UTF-8 / cp874)
+SNIFF_BYTES = 64 * 1024
+
+# ----------------------------------------------------
+# *** Cache กลางของทุกหน้า (key = mtime + ขนาดไฟล์) ***
+# ----------------------------------------------------
+# Streamlit รันทุก session/ทุกหน้าใน process เดียว cache ระดับ module จึงใช้ร่วมกันได้
+# แต่ละไฟล์ถูก parse ครั้งเดียวต่อการเปลี่ยนแปลง ผู้เรียกได้สำเนา (copy) ไปแก้ไขได้อิสระ
+_cache = {}
+_cache_lock = threading.Lock()
+
+def file_signature(path):
+    """(mtime_ns, size) ของไฟล์ หรือ None ถ้าไม่มีไฟล์"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _cached(key, signature, build):
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] == signature:
+            instrumentation.incr('data.cache_hit')
+            return hit[1]
+    instrumentation.incr('data.cache_miss')
+    value = build()
+    with _cache_lock:
+        _cache[key] = (signature, value)
+    return value
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+# ----------------------------------------------------
+# *** อ่าน CSV ***
+# ----------------------------------------------------
+# encoding ที่ตรวจพบแล้วต่อไฟล์ (โหลดซ้ำไม่ต้องตรวจใหม่)
+_encodings = {}
+
+def detect_encoding(path):
+    """เดา encoding จาก BOM และส่วนหัวของไฟล์ แทนการลอง parse ทั้งไฟล์ทีละ encoding"""
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(SNIFF_BYTES))
+
+def sniff_encoding(head):
+    """encoding ของไบต์ส่วนหัวไฟล์ (ใช้กับไฟล์ที่อัปโหลดได้ด้วย)"""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # final=False: ตัวอักษรหลายไบต์ที่ถูกตัดท้าย SNIFF_BYTES ไม่นับว่าผิด
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp874'
+
+@instrumentation.timed('data.parse_csv')
+def _read_csv(path):
+    encoding = _encodings.get(path) or detect_encoding(path)
+    try:
+        try:
+            df = pd.read_csv(path, encoding=encoding)
+        except UnicodeDecodeError:
+            # ส่วนหัวไม่พอจะตัดสิน (หรือไฟล์ถูกแทนที่ด้วย encoding อื่น): ลองอีกตัวครั้งเดียว
+            encoding = 'utf-8-sig' if encoding == 'cp874' else 'cp874'
+            df = pd.read_csv(path, encoding=encoding)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+    except (UnicodeDecodeError, pd.errors.ParserError) as e:
+        print(f"ERROR: อ่านไฟล์ {path} ไม่ได้: {e}")
+        return None
+    _encodings[path] = encoding
+    return df
+
+# ----------------------------------------------------
+# *** Snapshot (Feather) ***
+# ----------------------------------------------------
+def snapshot_path(path):
+    return os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+
+def _signature_bytes(signature):
+    return f"{signature[0]}:{signature[1]}".encode()
+
+@instrumentation.timed('data.read_snapshot')
+def _read_snapshot(path, signature):
+    """อ่าน snapshot ถ้ายังตรงกับ CSV ปัจจุบัน (เทียบ mtime/ขนาดที่บันทึกไว้ใน metadata)"""
+    snap = snapshot_path(path)
+    if feather is None or not os.path.exists(snap):
+        return None
+    try:
+        table = feather.read_table(snap, memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(SNAPSHOT_SIGNATURE_KEY) != _signature_bytes(signature):
+        return None
+    return table.to_pandas()
+
+def _write_snapshot(path, signature, df):
+    if feather is None or df is None or df.empty:
+        return
+    snap = snapshot_path(path)
+    tmp_file = f"{snap}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[SNAPSHOT_SIGNATURE_KEY] = _signature_bytes(signature)
+        table = table.replace_schema_metadata(metadata)
+        feather.write_feather(table, tmp_file, compression='uncompressed')
+        os.replace(tmp_file, snap)
+    except (OSError, pa.ArrowException) as e:
+        print(f"ERROR: เขียน snapshot {snap} ไม่ได้: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def _load_table(path, signature):
+    df = _read_snapshot(path, signature)
+    if df is None:
+        df = _read_csv(path)
+        _write_snapshot(path, signature, df)
+    return df
+
+def load_csv(path):
+    """อ่าน CSV ผ่าน cache กลาง (ใช้ snapshot ถ้ามี) คืนค่า None ถ้าไม่มีไฟล์หรืออ่านไม่ได้"""
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    df = _cached(('csv', path), signature, lambda: _load_table(path, signature))
+    return df.copy() if df is not None else None
+
+@instrumentation.timed('data.save_table')
+def save_table(path, df):
+    """เขียน CSV แบบ atomic พร้อม snapshot ของไฟล์ใหม่ (การโหลดครั้งแรกหลังนำเข้าจึงไม่ต้อง parse CSV)"""
+    tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        df.to_csv(tmp_file, index=False, encoding='utf_8_sig')
+        os.replace(tmp_file, path)
+    except OSError as e:
+        print(f"ERROR: เขียนไฟล์ {path} ไม่ได้: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return False
+    _encodings[path] = 'utf-8-sig'
+    _write_snapshot(path, file_signature(path), df.reset_index(drop=True))
+    return True
+
+# ----------------------------------------------------
+# *** พนักงาน / ของรางวัล ***
+# ----------------------------------------------------
+# คอลัมน์ข้อความที่ค่าซ้ำกันมาก เก็บเป็น categorical (รหัส int8/int16 + ตารางค่า)
+# ตัวกรองกลุ่ม/สถานะจึงเป็นการเทียบรหัสจำนวนเต็ม และหน่วยความจำต่อแถวเหลือไม่กี่ไบต์
+EMPLOYEE_CATEGORIES = ['กลุ่มจับรางวัล', 'แผนก']
+PRIZE_CATEGORIES = ['กลุ่มจับรางวัล', 'ชื่อของขวัญ']
+
+def _to_category(df, columns):
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+def _strip_group(df):
+    if 'กลุ่มจับรางวัล' in df.columns:
+        groups = df['กลุ่มจับรางวัล']
+        df['กลุ่มจับรางวัล'] = groups.where(groups.isna(), groups.astype(str).str.strip())
+
+def status_categorical(values):
+    """สถานะเป็น categorical ที่มี 'พร้อมสุ่ม' และ 'ได้รับแล้ว' เสมอ (เปลี่ยนค่าได้โดยไม่เปลี่ยน dtype)"""
+    values = pd.Series(values)
+    categories = [STATUS_READY, STATUS_WON]
+    categories += [v for v in values.dropna().unique() if v not in categories]
+    return pd.Categorical(values, categories=categories)
+
+def drop_unnamed_columns(df):
+    """ตัดคอลัมน์ที่ไม่มีหัวตาราง (เช่นคอลัมน์ว่าง/เลขแถวท้ายไฟล์ที่ export มาจาก Excel)"""
+    unnamed = [col for col in df.columns if str(col).startswith('Unnamed:') or not str(col).strip()]
+    return df.drop(columns=unnamed) if unnamed else df
+
+def _build_employees(path):
+    df = load_csv(path)
+    if df is None:
+        return pd.DataFrame()
+    df = drop_unnamed_columns(df)
+    if not df.empty:
+        if 'สถานะ' not in df.columns:
+            df['สถานะ'] = STATUS_READY
+        _strip_group(df)
+        _to_category(df, EMPLOYEE_CATEGORIES)
+        df['สถานะ'] = status_categorical(df['สถานะ'])
+    return df
+
+def _build_prizes(path):
+    df = load_csv(path)
+    if df is None:
+        return pd.DataFrame()
+    df = drop_unnamed_columns(df)
+    if not df.empty:
+        df['จำนวนคงเหลือ'] = pd.to_numeric(df['จำนวนคงเหลือ'], errors='coerce').fillna(0).astype(int)
+        _strip_group(df)
+        _to_category(df, PRIZE_CATEGORIES)
+    return df
+
+def load_employees(path=EMPLOYEE_FILE):
+    """รายชื่อพนักงาน (กลุ่ม/แผนก/สถานะเป็น categorical) แปลงครั้งเดียวต่อไฟล์ คืนสำเนาให้แก้ได้"""
+    return _cached(('employees', path), file_signature(path), lambda: _build_employees(path)).copy()
+
+def load_prizes(path=PRIZE_FILE):
+    """ของรางวัล (กลุ่ม/ชื่อของขวัญเป็น categorical) แปลงครั้งเดียวต่อไฟล์ คืนสำเนาให้แก้ได้"""
+    return _cached(('prizes', path), file_signature(path), lambda: _build_prizes(path)).copy()
+
+def _build_employee_order(path):
+    df = load_csv(path)
+    if df is None or 'ชื่อ-นามสกุล' not in df.columns or 'กลุ่มจับรางวัล' not in df.columns:
+        return pd.DataFrame()
+    df['ชื่อ-นามสกุล'] = df['ชื่อ-นามสกุล'].fillna('').astype(str).str.strip()
+    df['กลุ่มจับรางวัล'] = df['กลุ่มจับรางวัล'].fillna('').astype(str).str.strip()
+    df['_original_order'] = df.index
+    df['_rank_within_group'] = df.groupby('กลุ่มจับรางวัล')['_original_order'].rank(method='dense', ascending=True).astype(int)
+    return df[['ชื่อ-นามสกุล', 'กลุ่มจับรางวัล', '_original_order', '_rank_within_group']]
+
+def load_employee_order(path=EMPLOYEE_FILE):
+    """ลำดับพนักงานในรายชื่อ (ลำดับรวมและลำดับภายในกลุ่ม) สำหรับเรียงผลรางวัล"""
+    df = _cached(('order', path), file_signature(path), lambda: _build_employee_order(path))
+    return df.copy()
+
+# ----------------------------------------------------
+# *** ประวัติการสุ่ม (CSV + journal) ***
+# ----------------------------------------------------
+def load_history(path=HISTORY_FILE):
+    """ประวัติทั้งหมด: CSV ผ่าน cache กลาง ต่อด้วยรายการใน journal ที่ยังไม่ถูกรวม"""
+    df = load_csv(path)
+    if df is None:
+        if os.path.exists(path):
+            return None
+        df = pd.DataFrame(columns=history_store.HISTORY_COLUMNS)
+    pending = history_store.pending_records(len(df))
+    if pending:
+        df = pd.concat([df, pd.DataFrame(pending)], ignore_index=True)
+    return df
+
+def load_history_records(path=HISTORY_FILE):
+    df = load_history(path)
+    return df.to_dict('records') if df is not None else []
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def _read_complete_lines(path, offset, size):
+    """ไบต์ตั้งแต่ offset ถึงบรรทัดสุดท้ายที่เขียนครบ (ไม่รวมบรรทัดที่กำลังเขียนอยู่)"""
+    if size <= offset:
+        return b''
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    return data[:data.rfind(b'\n') + 1]
+
+class HistoryTail:
+    """อ่านประวัติแบบต่อท้าย: จำ byte offset ของ CSV/journal และจำนวนแถวที่อ่านแล้ว
+
+    ผู้อ่านแต่ละรายถือ HistoryTail ของตัวเอง read_new() parse เฉพาะไบต์ที่เพิ่มมาตั้งแต่ครั้งก่อน
+    อ่านใหม่ทั้งหมดเฉพาะเมื่อไฟล์ถูกตัด/แทนที่ (เขียน CSV ใหม่ทั้งไฟล์) หรือล้างประวัติ
+    """
+
+    def __init__(self, path=HISTORY_FILE, journal_path=history_store.JOURNAL_FILE):
+        self.path = path
+        self.journal_path = journal_path
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.csv_inode = None
+        self.csv_offset = 0
+        self.csv_rows = 0
+        self.header = b''
+        self.encoding = 'utf-8-sig'
+        self.journal_inode = None
+        self.journal_offset = 0
+        # อ่านไปแล้วอย่างน้อยหนึ่งครั้ง (ยังไม่มีไฟล์ประวัติก็ไม่นับเป็นการอ่านใหม่ทุกครั้ง)
+        self.started = False
+
+    def skip_to(self, rows):
+        """ผู้อ่านได้ rows แถวแรกจากทางอื่นแล้ว (เช่น draw_events): ไม่ต้องคืนซ้ำ"""
+        self.rows = max(self.rows, rows)
+
+    def _restarted(self, csv_stat, journal_stat):
+        if self.csv_inode is not None:
+            if csv_stat is None or csv_stat.st_ino != self.csv_inode or csv_stat.st_size < self.csv_offset:
+                return True
+        if self.journal_inode is not None and journal_stat is not None:
+            if journal_stat.st_ino != self.journal_inode:
+                return True
+            # journal ถูกตัดโดยที่ CSV ไม่โตขึ้น = ไม่ใช่การรวม journal แต่เป็นการล้างประวัติ
+            csv_size = csv_stat.st_size if csv_stat is not None else 0
+            if journal_stat.st_size < self.journal_offset and csv_size <= self.csv_offset:
+                return True
+        return csv_stat is None and journal_stat is None and self.rows > 0
+
+    def _read_csv_tail(self, stat):
+        self.csv_inode = stat.st_ino
+        data = _read_complete_lines(self.path, self.csv_offset, stat.st_size)
+        if not data:
+            return None
+        self.csv_offset += len(data)
+        if not self.header:
+            header_end = data.find(b'\n') + 1
+            self.header, data = data[:header_end], data[header_end:]
+            self.encoding = _encodings.get(self.path) or detect_encoding(self.path)
+        if not data:
+            return None
+        try:
+            df = pd.read_csv(io.BytesIO(self.header + data), encoding=self.encoding)
+        except (UnicodeDecodeError, pd.errors.ParserError) as e:
+            print(f"ERROR: อ่านไฟล์ {self.path} ไม่ได้: {e}")
+            return None
+        # แถวที่อ่านจาก journal ไปแล้วก่อนถูกรวมเข้า CSV
+        skip = max(0, self.rows - self.csv_rows)
+        self.csv_rows += len(df)
+        df = df.iloc[skip:]
+        self.rows += len(df)
+        return df
+
+    def _read_journal_tail(self, stat):
+        self.journal_inode = stat.st_ino
+        if stat.st_size < self.journal_offset:
+            # journal ถูกรวมเข้า CSV แล้วล้าง: อ่านใหม่จากต้นไฟล์
+            self.journal_offset = 0
+        data = _read_complete_lines(self.journal_path, self.journal_offset, stat.st_size)
+        self.journal_offset += len(data)
+        records = []
+        for line in data.decode('utf-8', errors='replace').splitlines():
+            entry = history_store.parse_journal_line(line)
+            if entry is not None and entry[0] >= self.rows:
+                records.append(entry[1])
+                self.rows += 1
+        return records
+
+    @instrumentation.timed('history.tail_read')
+    def read_new(self):
+        """คืน (DataFrame ของแถวใหม่, reloaded)
+
+        reloaded=True หมายถึงอ่านใหม่ตั้งแต่ต้น (ครั้งแรก, ไฟล์ถูกแทนที่ หรือล้างประวัติ)
+        ผู้อ่านต้องทิ้งข้อมูลเดิมแล้วใช้ DataFrame ที่ได้แทน
+        """
+        csv_stat, journal_stat = _stat(self.path), _stat(self.journal_path)
+        reloaded = not self.started and self.rows == 0
+        if self._restarted(csv_stat, journal_stat):
+            self.reset()
+            reloaded = True
+        self.started = True
+
+        frames = []
+        if csv_stat is not None:
+            df = self._read_csv_tail(csv_stat)
+            if df is not None and not df.empty:
+                frames.append(df)
+        if journal_stat is not None:
+            records = self._read_journal_tail(journal_stat)
+            if records:
+                frames.append(pd.DataFrame(records))
+        if not frames:
+            return pd.DataFrame(columns=history_store.HISTORY_COLUMNS), reloaded
+        return pd.concat(frames, ignore_index=True), reloaded
+
+# ----------------------------------------------------
+# *** ผลรางวัลแยกตามกลุ่ม (คำนวณครั้งเดียว ใช้ร่วมกันทุกหน้า) ***
+# ----------------------------------------------------
+def results_version():
+    return (file_signature(HISTORY_FILE), file_signature(history_store.JOURNAL_FILE), file_signature(EMPLOYEE_FILE))
+
+def _order_by_name():
+    """ลำดับในรายชื่อต่อชื่อพนักงาน (คนแรกที่ชื่อตรงกัน) สำหรับประวัติเก่าที่ไม่ได้บันทึกตำแหน่งไว้"""
+    def build():
+        order = load_employee_order()
+        if order.empty:
+            return order
+        return order.drop_duplicates('ชื่อ-นามสกุล').set_index('ชื่อ-นามสกุล')
+    return _cached(('order_by_name', EMPLOYEE_FILE), file_signature(EMPLOYEE_FILE), build)
+
+def _with_roster_keys(history):
+    """จัดรูปแบบประวัติ ลำดับในรายชื่อ (_emp_id, _rank_within_group) มาจากที่บันทึกไว้ตอนสุ่ม"""
+    history = history.copy()
+    for col in history_store.HISTORY_COLUMNS:
+        if col not in history.columns:
+            history[col] = ''
+        history[col] = history[col].fillna('').astype(str)
+    history['ชื่อ-นามสกุล'] = history['ชื่อ-นามสกุล'].str.strip()
+    history['กลุ่มจับรางวัล'] = history['กลุ่มจับรางวัล'].str.strip()
+    for col in ('_emp_id', '_rank_within_group'):
+        history[col] = pd.to_numeric(history[col], errors='coerce') if col in history.columns else float('nan')
+
+    # ประวัติก่อนมีคอลัมน์ตำแหน่ง: เติมจากรายชื่อด้วยชื่อ (map ทีละแถว ไม่ใช่ merge)
+    missing = history['_emp_id'].isna()
+    if missing.any():
+        order = _order_by_name()
+        if not order.empty:
+            names = history.loc[missing, 'ชื่อ-นามสกุล']
+            history.loc[missing, '_emp_id'] = names.map(order['_original_order'])
+            history.loc[missing, '_rank_within_group'] = names.map(order['_rank_within_group'])
+    return history
+
+def _index_groups(merged, index=None):
+    """เพิ่มผลรางวัลเข้า index แยกตามกลุ่ม (คืน dict ใหม่ ไม่แก้ของเดิมที่ session อื่นอาจอ่านอยู่)"""
+    index = dict(index or {})
+    for group, df_new in merged.groupby('กลุ่มจับรางวัล', sort=False):
+        if group in index:
+            df_new = pd.concat([index[group].drop(columns=['ลำดับที่']), df_new], ignore_index=True)
+        df_group = df_new.sort_values('_emp_id', na_position='last', kind='stable').reset_index(drop=True)
+        df_group.insert(0, 'ลำดับที่', range(1, 1 + len(df_group)))
+        index[group] = df_group
+    return index
+
+# สถานะของ index ผลรางวัลที่ใช้ร่วมกันทุก session
+# rows = จำนวนรายการในประวัติที่รวมเข้า index แล้ว, version เพิ่มขึ้นทุกครั้งที่ index เปลี่ยน
+_results = {'generation': None, 'employees': None, 'rows': 0, 'version': 0, 'index': {}}
+_results_lock = threading.Lock()
+_results_tail = HistoryTail()
+
+def _append_results(df_new):
+    _results['index'] = _index_groups(_with_roster_keys(df_new), _results['index'])
+
+@instrumentation.timed('results.refresh')
+def _refresh_results():
+    changed = False
+    gen = draw_events.generation()
+    employees = file_signature(EMPLOYEE_FILE)
+    if _results['generation'] != gen or _results['employees'] != employees:
+        # ล้างประวัติ / รายชื่อพนักงานเปลี่ยน / process เพิ่งเริ่ม: สร้าง index ใหม่
+        _results_tail.reset()
+        _results.update(generation=gen, employees=employees, rows=0, index={})
+        changed = True
+
+    # มีผู้โชคดีใหม่จากลูปการสุ่มใน process นี้: ต่อท้ายจากหน่วยความจำ
+    new_records = draw_events.records_since(gen, _results['rows'])
+    if new_records:
+        _append_results(pd.DataFrame(new_records))
+        _results['rows'] += len(new_records)
+        _results_tail.skip_to(_results['rows'])
+        changed = True
+
+    # ไฟล์ประวัติ: parse เฉพาะส่วนที่ต่อท้ายมาตั้งแต่ครั้งก่อน
+    df_new, reloaded = _results_tail.read_new()
+    if reloaded:
+        instrumentation.incr('results.reload')
+        _results['index'] = _index_groups(_with_roster_keys(df_new)) if not df_new.empty else {}
+        changed = True
+    elif not df_new.empty:
+        _append_results(df_new)
+        changed = True
+    _results['rows'] = _results_tail.rows
+    if changed:
+        _results['version'] += 1
+
+def load_results_index():
+    """dict: กลุ่ม -> ผลรางวัลของกลุ่ม (เรียงตามลำดับในรายชื่อพนักงาน มีคอลัมน์ 'ลำดับที่')
+
+    ผู้โชคดีใหม่ถูกต่อท้ายทีละแถว (จาก draw_events หรือส่วนท้ายของไฟล์ประวัติ)
+    สร้างใหม่ทั้งหมดเฉพาะเมื่อล้างประวัติหรือไฟล์ถูกแทนที่ ผลลัพธ์ใช้ร่วมกันทุก session ห้ามแก้ไข
+    """
+    with _results_lock:
+        _refresh_results()
+        return _results['index']
+
+def results_token():
+    """ค่าที่เปลี่ยนทุกครั้งที่ผลรางวัลเปลี่ยน (ใช้ตรวจว่าหน้าจอต้อง rerun หรือไม่)"""
+    with _results_lock:
+        _refresh_results()
+        return (_results['generation'], _results['version'])
+
+def load_group_names(path=EMPLOYEE_FILE):
+    """ชื่อกลุ่มจับรางวัลตามลำดับที่พบใน employees.csv"""
+    order = load_employee_order(path)
+    if order.empty:
+        return []
+    return [g for g in order['กลุ่มจับรางวัล'].unique() if g]
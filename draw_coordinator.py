@@ -0,0 +1,218 @@
+import contextlib
+import threading
+
+import pandas as pd
+
+import data_store
+import draw_events
+import history_store
+import instrumentation
+import sqlite_store
+from draw_engine import (BATCH_RESULT_COLUMNS, BATCH_STREAM, draw_all_groups, group_rng, new_event_seed,
+                         run_draw)
+from draw_state import DrawState, STATUS_READY, match_winners
+
+# ----------------------------------------------------
+# *** ผู้ประสานการสุ่มที่ใช้ร่วมกันทุก session ***
+# ----------------------------------------------------
+# ทุกเครื่องที่เปิดแอปอยู่ใน process เดียวกัน จึงถือรายชื่อ/ของรางวัล/ประวัติชุดเดียว
+# แทนสำเนาต่อ session (สองเครื่องจะไม่แจกพนักงานหรือของรางวัลซ้ำกัน และไม่เขียนประวัติทับกัน)
+# - กลุ่มเดียวกันสุ่มได้ทีละเครื่อง (lock ต่อกลุ่ม) กลุ่มต่างกันสุ่มพร้อมกันได้
+# - การบันทึกผล (สถานะ, ของรางวัล, ลำดับในประวัติ) ทำภายใต้ _commit_lock ซึ่งถือไว้สั้นๆ
+# - สุ่มทุกกลุ่มพร้อมกันและล้างประวัติถือ lock ของทุกกลุ่ม
+# - เมื่อเปิด SQLite หลาย process ใช้ฐานข้อมูลร่วมกัน: ถ้าบันทึกชนกัน ผลรอบนั้นถูกยกเลิก
+# - ล้างประวัติ/นำเข้ารายชื่อสร้าง SharedDraw ใหม่: การสุ่มที่รอ lock อยู่กับสถานะเดิมจะไม่ถูกบันทึก
+
+def load_data():
+    emp_df, prize_df = data_store.load_employees(), data_store.load_prizes()
+    if sqlite_store.ENABLED:
+        # สถานะที่บันทึกไว้ในฐานข้อมูลอยู่รอดข้ามการ restart และใช้ร่วมกันทุก process
+        sqlite_store.sync_roster(emp_df, prize_df)
+        sqlite_store.apply_state(emp_df, prize_df)
+    return emp_df, prize_df
+
+def _clean(value):
+    return '' if pd.isna(value) else str(value).strip()
+
+def _restore_winners(draw_state, history):
+    """ตั้งผู้โชคดีในประวัติเป็น 'ได้รับแล้ว' และตัดของรางวัลที่แจกไปแล้วออกจาก draw_state
+
+    จับคู่ด้วย draw_state.match_winners: _emp_key (คงที่แม้นำเข้ารายชื่อใหม่) ถ้าไม่ตรง (ประวัติเก่า
+    หรือแก้แผนกในรายชื่อ) ใช้ _emp_id ถ้าแถวนั้นยังเป็นคนเดิม ไม่งั้นใช้ชื่อ + กลุ่ม
+    """
+    if not history:
+        return
+    emp_df = draw_state.emp_df
+    depts = emp_df['แผนก'] if 'แผนก' in emp_df.columns else pd.Series('', index=emp_df.index)
+    matched = match_winners(
+        [(record.get('_emp_key'), int(record['_emp_id']) if pd.notna(record.get('_emp_id')) else None,
+          record.get('ชื่อ-นามสกุล'), record.get('กลุ่มจับรางวัล')) for record in history],
+        zip(emp_df.index, emp_df['ชื่อ-นามสกุล'], depts, emp_df['กลุ่มจับรางวัล']))
+
+    # ของรางวัลถูกตัดทุกรายการ แม้ผู้โชคดีจะไม่อยู่ในรายชื่อปัจจุบันแล้ว
+    draw_state.mark_winners(pd.DataFrame({
+        'emp_id': pd.Series(matched, dtype=object),
+        'กลุ่มจับรางวัล': [_clean(record.get('กลุ่มจับรางวัล')) for record in history],
+        'รายการของขวัญ': [record.get('รายการของขวัญ') for record in history],
+    }))
+
+class SharedDraw:
+    """สถานะการสุ่มชุดเดียวของทั้ง process (รายชื่อ, ของรางวัล, ประวัติ, seed, ลำดับรอบ)"""
+
+    def __init__(self):
+        self.emp_df, self.prize_df = load_data()
+        self.draw_state = DrawState(self.emp_df, self.prize_df)
+        self.history = data_store.load_history_records()
+        if not sqlite_store.ENABLED:
+            # สถานะไม่ได้ถูกเก็บแยก: กู้คืนจากประวัติ ไม่งั้นเริ่ม process ใหม่แล้วแจกซ้ำได้
+            _restore_winners(self.draw_state, self.history)
+        seed, self.draw_no = history_store.last_draw_audit(self.history)
+        self.event_seed = seed if seed is not None else new_event_seed()
+        self.groups = []
+        if not self.emp_df.empty:
+            self.groups = [g for g in self.emp_df['กลุ่มจับรางวัล'].unique() if pd.notna(g)]
+
+_shared = None
+_shared_lock = threading.Lock()
+_commit_lock = threading.Lock()
+_group_locks = {}
+_group_locks_guard = threading.Lock()
+
+def get_state():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedDraw()
+        return _shared
+
+def group_lock(group):
+    with _group_locks_guard:
+        return _group_locks.setdefault(str(group).strip(), threading.Lock())
+
+@contextlib.contextmanager
+def _all_groups_locked(state):
+    # เรียงชื่อกลุ่มเสมอ เพื่อไม่ให้สองเครื่องรอ lock กันเอง (deadlock)
+    with contextlib.ExitStack() as stack:
+        for group in sorted({str(g).strip() for g in state.groups}):
+            stack.enter_context(group_lock(group))
+        yield
+
+def set_event_seed(seed):
+    with _commit_lock:
+        get_state().event_seed = int(seed)
+
+def _next_draw(state):
+    with _commit_lock:
+        draw_no = state.draw_no
+        if sqlite_store.ENABLED:
+            # process อื่นอาจใช้ seed เดียวกัน: ลำดับรอบต้องไม่ซ้ำกัน ไม่งั้นสุ่มซ้ำตรวจสอบไม่ได้
+            draw_no = sqlite_store.next_draw_no(draw_no)
+        state.draw_no = draw_no + 1
+        return state.event_seed, draw_no
+
+def _persist_shared(state, records):
+    """เขียนไฟล์ประวัติเมื่อเปิด SQLite (เรียกภายในธุรกรรม ทีละ process)"""
+    def persist(start_seq):
+        history_store.append_records(start_seq, records)
+        if start_seq == len(state.history):
+            # ไม่มี process อื่นบันทึกแทรก: ต่อท้ายประวัติในหน่วยความจำ (ไม่อ่าน CSV ใหม่ทุกรอบ)
+            state.history.extend(records)
+        else:
+            # process อื่นบันทึกผู้โชคดีไปก่อน: สร้างประวัติใหม่จากไฟล์ซึ่งมีผู้โชคดีของทุก process
+            state.history = data_store.load_history_records()
+        history_store.compact(state.history)
+    return persist
+
+def _commit_shared(state, results, records):
+    expected_seq = len(state.history)
+    start_seq = sqlite_store.commit_winners(results['emp_id'].tolist(), records, _persist_shared(state, records))
+    if start_seq is None or start_seq != expected_seq:
+        # ชนกัน หรือ process อื่นบันทึกผู้โชคดีไปก่อน: โหลดสถานะล่าสุดจากฐานข้อมูล
+        sqlite_store.apply_state(state.emp_df, state.prize_df)
+        state.draw_state = DrawState(state.emp_df, state.prize_df)
+    else:
+        state.draw_state.mark_winners(results)
+    return start_seq
+
+@instrumentation.timed('draw.commit')
+def _commit(state, results, audit):
+    """บันทึกผลการสุ่มหนึ่งรอบ: สถานะ + ของรางวัล + journal/CSV แล้วแจ้งหน้าผลรางวัล
+
+    คืน False ถ้าสถานะถูกแทนที่ระหว่างรอ (ล้างประวัติ/นำเข้ารายชื่อ)
+    หรือ process อื่นบันทึกผู้โชคดีคนเดียวกันไปก่อน (เฉพาะเมื่อเปิด SQLite)
+    """
+    keys = state.draw_state.roster_keys(results['emp_id'])
+    records = results[history_store.HISTORY_COLUMNS].assign(**keys, **audit).to_dict('records')
+    with _commit_lock:
+        if state is not _shared:
+            # ผลนี้สุ่มจากสถานะเดิม: บันทึกแล้วจะเขียนผู้โชคดีเก่ากลับลงประวัติที่ล้างไปแล้ว
+            instrumentation.incr('draw.conflict')
+            return False
+        if sqlite_store.ENABLED:
+            start_seq = _commit_shared(state, results, records)
+            if start_seq is None:
+                instrumentation.incr('draw.conflict')
+                return False
+        else:
+            start_seq = len(state.history)
+            state.draw_state.mark_winners(results)
+            state.history.extend(records)
+            history_store.append_records(start_seq, records)
+            history_store.compact(state.history)
+        draw_events.publish(start_seq, records)
+    instrumentation.incr('draw.winners', len(records))
+    return True
+
+def draw_group(group):
+    """สุ่มทั้งกลุ่มแล้วบันทึกผลทันที
+
+    คืน DataFrame (คอลัมน์ BATCH_RESULT_COLUMNS + _seed/_draw_no/_batch, ว่างถ้าไม่มีพนักงาน/ของรางวัลเหลือ)
+    หรือ None ถ้าบันทึกชนกับเครื่องอื่นหรือสถานะถูกแทนที่ระหว่างรอ (สถานะถูกโหลดใหม่แล้ว สุ่มซ้ำได้ทันที)
+    """
+    with group_lock(group):
+        # ดึงสถานะหลังได้ lock: ล้างประวัติ/นำเข้ารายชื่อที่ถือ lock อยู่อาจแทนที่สถานะเดิมไปแล้ว
+        state = get_state()
+        seed, draw_no = _next_draw(state)
+        pairs = run_draw(group, state.draw_state, rng=group_rng(seed, group, draw_no))
+        results = pd.DataFrame([(emp_id, name, dept, group, prize) for (emp_id, name, dept), prize in pairs],
+                               columns=BATCH_RESULT_COLUMNS)
+        if results.empty:
+            return results
+        audit = {'_seed': seed, '_draw_no': draw_no, '_batch': 0}
+        if not _commit(state, results, audit):
+            return None
+        return results.assign(**audit)
+
+def draw_all():
+    """สุ่มทุกกลุ่มในรอบเดียวแล้วบันทึกผล (คืนค่าเหมือน draw_group)"""
+    state = get_state()
+    with _all_groups_locked(state):
+        seed, draw_no = _next_draw(state)
+        results = draw_all_groups(state.emp_df, state.prize_df, STATUS_READY,
+                                  rng=group_rng(seed, BATCH_STREAM, draw_no))
+        if results.empty:
+            return results
+        audit = {'_seed': seed, '_draw_no': draw_no, '_batch': 1}
+        if not _commit(state, results, audit):
+            return None
+        return results.assign(**audit)
+
+def clear_history():
+    """ล้างประวัติทั้งหมดแล้วเริ่มสถานะใหม่จากไฟล์รายชื่อ (รอให้การสุ่มที่ค้างอยู่เสร็จก่อน)"""
+    global _shared
+    state = get_state()
+    with _all_groups_locked(state), _commit_lock:
+        history_store.clear_history()
+        draw_events.reset()
+        if sqlite_store.ENABLED:
+            sqlite_store.reset(data_store.load_employees(), data_store.load_prizes())
+        with _shared_lock:
+            _shared = SharedDraw()
+
+def reload_roster():
+    """โหลดรายชื่อ/ของรางวัลใหม่หลังนำเข้าไฟล์ (ประวัติเดิมยังอยู่; รอให้การสุ่มที่ค้างอยู่เสร็จก่อน)"""
+    global _shared
+    state = get_state()
+    with _all_groups_locked(state), _commit_lock:
+        with _shared_lock:
+            _shared = SharedDraw()
@@ -0,0 +1,226 @@
+import secrets
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from draw_state import DrawState, STATUS_READY
+
+# ----------------------------------------------------
+# *** RNG แบบกำหนด seed (สุ่มซ้ำ/ตรวจสอบย้อนหลังได้) ***
+# ----------------------------------------------------
+# stream ของการสุ่มทุกกลุ่มพร้อมกัน (การสุ่มรายกลุ่มใช้ชื่อกลุ่มเป็น stream)
+BATCH_STREAM = '*'
+
+def new_event_seed():
+    """seed ใหม่ของงาน (48 บิต เก็บใน CSV เป็นตัวเลขได้โดยไม่เสียความแม่นยำ)"""
+    return secrets.randbits(48)
+
+def group_rng(event_seed, stream, draw_no):
+    """Generator อิสระต่อ (กลุ่ม, รอบการสุ่ม) ที่ได้จาก seed ของงาน
+
+    draw_no คือลำดับรอบการสุ่มภายในงาน ทำให้การสุ่มกลุ่มเดิมซ้ำได้ผลคนละชุด
+    แต่ยังสร้างซ้ำได้ทุกครั้งจาก (seed, stream, draw_no) เดิม
+    """
+    stream_key = zlib.crc32(str(stream).strip().encode('utf-8'))
+    seed_seq = np.random.SeedSequence(int(event_seed), spawn_key=(int(draw_no), stream_key))
+    return np.random.default_rng(seed_seq)
+
+# ----------------------------------------------------
+# *** Fenwick tree สำหรับสุ่มของขวัญแบบไม่ใส่คืน ***
+# ----------------------------------------------------
+class _FenwickTree:
+    """Binary indexed tree บนจำนวนคงเหลือของของขวัญแต่ละแถว
+
+    ใช้เลือกชิ้นที่ target (0-based) จาก multiset ในเวลา O(log m)
+    โดยไม่ต้องขยายของขวัญเป็น list ทีละชิ้น
+    """
+
+    def __init__(self, counts):
+        self.size = len(counts)
+        self.tree = [0] * (self.size + 1)
+        for i, count in enumerate(counts, start=1):
+            self.tree[i] += count
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.top_bit = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """index ของแถวที่ชิ้นลำดับ target (0-based) อยู่"""
+        pos = 0
+        bit = self.top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            bit >>= 1
+        return pos
+
+def sample_prizes(names, counts, k, rng=None):
+    """สุ่มของขวัญ k ชิ้นแบบไม่ใส่คืนจากคู่ (ชื่อ, จำนวน)
+
+    หน่วยความจำเป็นสัดส่วนกับจำนวนชนิดของขวัญ ไม่ใช่จำนวนชิ้นรวม
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    counts = [max(int(c), 0) for c in counts]
+    total = sum(counts)
+    k = min(int(k), total)
+    if k <= 0:
+        return []
+
+    tree = _FenwickTree(counts)
+    # ชิ้นที่ j เลือกจาก (total - j) ชิ้นที่เหลือ: สุ่มเลขทั้งหมดทีเดียว
+    remaining = total - np.arange(k)
+    targets = np.minimum((rng.random(k) * remaining).astype(np.int64), remaining - 1)
+
+    selected = []
+    for target in targets.tolist():
+        i = tree.find(target)
+        tree.add(i, -1)
+        selected.append(names[i])
+    return selected
+
+# ----------------------------------------------------
+# *** สุ่มรายกลุ่ม ***
+# ----------------------------------------------------
+def run_draw(group, draw_state, rng=None):
+    """สุ่มผู้โชคดีทั้งกลุ่มจาก pool ที่ DrawState เตรียมไว้ (ไม่ต้องกรองทั้งตาราง)"""
+    rng = rng if rng is not None else np.random.default_rng()
+    with instrumentation.timer('draw.filter'):
+        emp_ids = draw_state.available_ids(group)
+        prize_ids, prize_counts = draw_state.available_prizes(group)
+
+    max_draws = min(len(emp_ids), sum(prize_counts))
+    if max_draws == 0: return []
+
+    with instrumentation.timer('draw.sample'):
+        # ลำดับเดียวกับ DataFrame.sample(random_state=rng) เดิม ผลจาก seed เดิมจึงไม่เปลี่ยน
+        winners = emp_ids[rng.choice(len(emp_ids), size=max_draws, replace=False)]
+        emp_df = draw_state.emp_df
+        selected_employees = list(zip(winners, emp_df.loc[winners, 'ชื่อ-นามสกุล'], emp_df.loc[winners, 'แผนก']))
+        prize_names = draw_state.prize_df.loc[prize_ids, 'ชื่อของขวัญ'].tolist()
+        selected_prizes = sample_prizes(prize_names, prize_counts, max_draws, rng)
+    return list(zip(selected_employees, selected_prizes))
+
+# ----------------------------------------------------
+# *** สุ่มทุกกลุ่มพร้อมกัน (vectorized) ***
+# ----------------------------------------------------
+BATCH_RESULT_COLUMNS = ['emp_id', 'ชื่อ-นามสกุล', 'แผนก', 'กลุ่มจับรางวัล', 'รายการของขวัญ']
+
+def _shuffle_within_groups(codes, rng):
+    """ลำดับ index ที่เรียงตามกลุ่ม และสุ่มลำดับภายในแต่ละกลุ่ม"""
+    return np.lexsort((rng.random(len(codes)), codes))
+
+@instrumentation.timed('draw.batch')
+def draw_all_groups(emp_df, prize_df, status_ready, rng=None):
+    """สุ่มผู้โชคดีของทุกกลุ่มในรอบเดียว คืนค่าเป็น DataFrame เดียว
+
+    พนักงานและของขวัญถูกแปลงเป็น integer array แบ่งตามรหัสกลุ่ม
+    แล้วสุ่มลำดับภายในกลุ่มด้วย lexsort บนเลขสุ่ม ไม่มี loop ต่อคน
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    empty = pd.DataFrame(columns=BATCH_RESULT_COLUMNS)
+    if emp_df.empty or prize_df.empty:
+        return empty
+
+    emp_groups = emp_df['กลุ่มจับรางวัล']
+    emp_mask = (emp_df['สถานะ'] == status_ready).to_numpy() & emp_groups.notna().to_numpy()
+    stock = prize_df['จำนวนคงเหลือ'].to_numpy(dtype=np.int64)
+    prize_mask = (stock > 0) & prize_df['กลุ่มจับรางวัล'].notna().to_numpy()
+
+    emp_pos = np.flatnonzero(emp_mask)
+    prize_pos = np.flatnonzero(prize_mask)
+    emp_labels = emp_groups.to_numpy()[emp_pos].astype(str)
+    prize_labels = prize_df['กลุ่มจับรางวัล'].to_numpy()[prize_pos].astype(str)
+
+    # รหัสกลุ่มร่วมกันระหว่างพนักงานและของขวัญ (เรียงตามลำดับที่พบในรายชื่อพนักงาน)
+    all_codes, group_names = pd.factorize(
+        np.concatenate([np.char.strip(emp_labels), np.char.strip(prize_labels)]), sort=False)
+    emp_codes = all_codes[:len(emp_pos)]
+    prize_codes = all_codes[len(emp_pos):]
+    n_groups = len(group_names)
+
+    # จำนวนที่สุ่มได้ต่อกลุ่ม = min(พนักงานที่พร้อม, ของขวัญคงเหลือ)
+    emp_per_group = np.bincount(emp_codes, minlength=n_groups)
+    stock_per_group = np.bincount(prize_codes, weights=stock[prize_pos], minlength=n_groups).astype(np.int64)
+    draws_per_group = np.minimum(emp_per_group, stock_per_group)
+    if draws_per_group.sum() == 0:
+        return empty
+
+    # พนักงาน: สุ่มลำดับในกลุ่มแล้วเลือก draws_per_group[g] คนแรก
+    order = _shuffle_within_groups(emp_codes, rng)
+    sorted_codes = emp_codes[order]
+    group_start = np.cumsum(emp_per_group) - emp_per_group
+    rank = np.arange(len(order)) - group_start[sorted_codes]
+    chosen = order[rank < draws_per_group[sorted_codes]]
+    winner_pos = emp_pos[chosen]
+    winner_codes = emp_codes[chosen]
+
+    # ของขวัญ: multivariate hypergeometric ต่อกลุ่ม = สุ่มแบบไม่ใส่คืนจาก (ชนิด, จำนวน)
+    prize_items = []
+    for g in np.flatnonzero(draws_per_group):
+        rows = prize_pos[prize_codes == g]
+        taken = rng.multivariate_hypergeometric(stock[rows], int(draws_per_group[g]))
+        prize_items.append(np.repeat(rows, taken))
+    prize_items = np.concatenate(prize_items)
+    prize_items_codes = np.repeat(np.flatnonzero(draws_per_group), draws_per_group[draws_per_group > 0])
+    prize_items = prize_items[_shuffle_within_groups(prize_items_codes, rng)]
+
+    # winner_codes เรียงตามกลุ่มเหมือน prize_items จึงจับคู่ตามตำแหน่งได้ทันที
+    return pd.DataFrame({
+        'emp_id': emp_df.index.to_numpy()[winner_pos],
+        'ชื่อ-นามสกุล': emp_df['ชื่อ-นามสกุล'].to_numpy()[winner_pos],
+        'แผนก': emp_df['แผนก'].to_numpy()[winner_pos],
+        'กลุ่มจับรางวัล': np.asarray(group_names, dtype=object)[winner_codes],
+        'รายการของขวัญ': prize_df['ชื่อของขวัญ'].to_numpy()[prize_items],
+    })
+
+# ----------------------------------------------------
+# *** สุ่มซ้ำจาก seed เพื่อตรวจสอบผลย้อนหลัง ***
+# ----------------------------------------------------
+def replay_history(emp_df, prize_df, history_df):
+    """สุ่มทุกรอบในประวัติซ้ำจาก (_seed, _draw_no) ที่บันทึกไว้
+
+    เริ่มจากรายชื่อ/ของขวัญตั้งต้น คืนค่า list ของ _draw_no ที่ผลไม่ตรงกับประวัติ
+    """
+    state = DrawState(emp_df.copy(), prize_df.copy())
+    mismatched = []
+    if '_seed' not in history_df.columns or '_draw_no' not in history_df.columns:
+        return mismatched
+
+    audited = history_df.dropna(subset=['_seed', '_draw_no'])
+    for (seed, draw_no), recorded in audited.groupby(['_seed', '_draw_no'], sort=False):
+        is_batch = '_batch' in recorded.columns and recorded['_batch'].fillna(0).astype(bool).any()
+        if is_batch:
+            results = draw_all_groups(state.emp_df, state.prize_df, STATUS_READY,
+                                      rng=group_rng(seed, BATCH_STREAM, draw_no))
+        else:
+            group = recorded['กลุ่มจับรางวัล'].iloc[0]
+            pairs = run_draw(group, state, rng=group_rng(seed, group, draw_no))
+            results = pd.DataFrame([(emp_id, name, dept, group, prize) for (emp_id, name, dept), prize in pairs],
+                                   columns=BATCH_RESULT_COLUMNS)
+
+        expected = list(zip(results['ชื่อ-นามสกุล'], results['รายการของขวัญ']))
+        actual = list(zip(recorded['ชื่อ-นามสกุล'], recorded['รายการของขวัญ']))
+        if expected != actual:
+            mismatched.append(int(draw_no))
+        state.mark_winners(results)
+    return mismatched
+
+if __name__ == '__main__':
+    # ตรวจสอบผลการสุ่มย้อนหลังแบบ offline: python draw_engine.py
+    import data_store
+
+    emp_df, prize_df = data_store.load_employees(), data_store.load_prizes()
+    history_df = pd.DataFrame(data_store.load_history_records())
+    bad = replay_history(emp_df, prize_df, history_df)
+    print("ผลการสุ่มตรงกับ seed ทุกรอบ" if not bad else f"ผลไม่ตรงในรอบที่: {bad}")
@@ -0,0 +1,59 @@
+import threading
+
+# ----------------------------------------------------
+# *** แจ้งผู้โชคดีใหม่ภายใน process (pub/sub) ***
+# ----------------------------------------------------
+# ทุก session ของ Streamlit อยู่ใน process เดียว ลูปการสุ่มจึง publish รายการใหม่
+# ให้หน้าผลรางวัลที่เปิดอยู่ดึงไปต่อท้ายได้ทันที โดยไม่ต้องอ่านไฟล์ประวัติใหม่ทั้งไฟล์
+#
+# seq ของแต่ละรายการคือตำแหน่งในประวัติ (เหมือนใน journal)
+# generation เพิ่มขึ้นทุกครั้งที่ล้างประวัติ ผู้อ่านต้องโหลดใหม่ทั้งหมดเมื่อ generation เปลี่ยน
+
+# เก็บรายการล่าสุดไว้เท่านี้ ผู้อ่านที่ตามไม่ทันจะโหลดจากไฟล์แทน
+MAX_BUFFERED = 10000
+
+_lock = threading.Lock()
+_generation = 0
+_base_seq = 0
+_records = []
+
+def publish(start_seq, records):
+    """แจ้งรายการใหม่ที่บันทึกลงไฟล์แล้ว (start_seq = ตำแหน่งของรายการแรก)"""
+    global _base_seq, _records
+    if not records:
+        return
+    with _lock:
+        if start_seq != _base_seq + len(_records):
+            # ไม่ต่อเนื่องกับที่มีอยู่ (เช่น process เพิ่งเริ่ม): เริ่มบัฟเฟอร์ใหม่จากตรงนี้
+            _base_seq, _records = start_seq, []
+        _records.extend(records)
+        overflow = len(_records) - MAX_BUFFERED
+        if overflow > 0:
+            _records = _records[overflow:]
+            _base_seq += overflow
+
+def reset():
+    """ล้างประวัติแล้ว: ผู้อ่านทุกคนต้องโหลดใหม่"""
+    global _generation, _base_seq, _records
+    with _lock:
+        _generation += 1
+        _base_seq, _records = 0, []
+
+def generation():
+    with _lock:
+        return _generation
+
+def records_since(gen, seq):
+    """รายการตั้งแต่ตำแหน่ง seq ของ generation gen
+
+    คืน [] ถ้ายังไม่มีรายการใหม่ และ None ถ้าบัฟเฟอร์ไม่ครอบคลุม (ต้องโหลดจากไฟล์)
+    """
+    with _lock:
+        if gen != _generation:
+            return None
+        end_seq = _base_seq + len(_records)
+        if seq >= end_seq:
+            return []
+        if seq < _base_seq:
+            return None
+        return _records[seq - _base_seq:]
@@ -0,0 +1,221 @@
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+STATUS_READY = 'พร้อมสุ่ม'
+STATUS_WON = 'ได้รับแล้ว'
+
+# ----------------------------------------------------
+# *** จัดรูปข้อความภาษาไทย ***
+# ----------------------------------------------------
+# ใช้ทั้งตอนนำเข้ารายชื่อ (roster_import) และตอนสร้าง employee_key: ต้องเป็นฟังก์ชันเดียวกัน
+# ไม่งั้นชื่อที่ถูกจัดรูปตอนนำเข้าจะได้ key ไม่ตรงกับที่บันทึกไว้ในประวัติ
+_INVISIBLE = re.compile('[\u200b\u200c\u200d\u2060\ufeff]')
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(value, collapse=True):
+    """NFC + ตัดอักขระล่องหน + แก้สระอำที่พิมพ์แยก (ํ + า) + ตัดช่องว่างหัวท้าย
+
+    collapse=True: ช่องว่างหลายตัวเหลือตัวเดียว (ชื่อกลุ่ม)
+    collapse=False: คงช่องว่างภายในไว้ตามต้นฉบับ (ชื่อพนักงานใช้สองช่องคั่นชื่อกับนามสกุล)
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    text = unicodedata.normalize('NFC', str(value))
+    text = _INVISIBLE.sub('', text).replace('\u0e4d\u0e32', '\u0e33')
+    if collapse:
+        text = _WHITESPACE.sub(' ', text)
+    else:
+        # แทนแท็บ/ช่องว่างพิเศษด้วยช่องว่างปกติ จำนวนเท่าเดิม
+        text = _WHITESPACE.sub(lambda m: ' ' * len(m.group()), text)
+    return text.strip()
+
+# ----------------------------------------------------
+# *** รหัสพนักงานที่คงที่ข้ามการนำเข้ารายชื่อใหม่ ***
+# ----------------------------------------------------
+# ตำแหน่งแถว (emp_id) เปลี่ยนได้เมื่อรายชื่อถูกนำเข้าใหม่/เรียงใหม่ ประวัติจึงบันทึก hash ของ
+# (ชื่อ, แผนก, กลุ่ม) ที่จัดรูปแล้วไว้ด้วย แถวที่ข้อมูลตรงกันทั้งหมดได้ key เดียวกัน
+def employee_key(name, dept, group):
+    raw = '\x1f'.join(normalize_text(v) for v in (name, dept, group))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def match_winners(winners, employees):
+    """จับคู่ผู้โชคดีที่บันทึกไว้กับพนักงานในรายชื่อปัจจุบัน (พนักงานหนึ่งคนต่อผู้โชคดีหนึ่งรายการ)
+
+    winners: list ของ (emp_key, emp_id, ชื่อ, กลุ่ม) ตามลำดับในประวัติ (ประวัติเก่าไม่มี emp_key/emp_id)
+    employees: iterable ของ (emp_id, ชื่อ, แผนก, กลุ่ม)
+    จับคู่ทีละขั้น: emp_key -> emp_id ที่ยังเป็นคนเดิม (ชื่อ + กลุ่มตรงกัน) -> ชื่อ + กลุ่ม
+    ขั้นหลังรองรับประวัติเก่าและรายชื่อที่ถูกแก้แผนก (key ไม่ตรงแล้ว)
+    คืน list ของ emp_id ตามลำดับ winners (None ถ้าไม่พบ)
+    """
+    winners = [(key, emp_id, normalize_text(name), normalize_text(group)) for key, emp_id, name, group in winners]
+    wanted = {name for _, _, name, _ in winners}
+    by_key, by_name, roster = {}, {}, {}
+    for emp_id, name, dept, group in employees:
+        name = normalize_text(name)
+        if name not in wanted:
+            continue
+        group = normalize_text(group)
+        by_key.setdefault(employee_key(name, dept, group), []).append(emp_id)
+        by_name.setdefault((name, group), []).append(emp_id)
+        roster[emp_id] = (name, group)
+
+    stages = (
+        lambda key, emp_id, name, group: by_key.get(key, []) if isinstance(key, str) and key else [],
+        lambda key, emp_id, name, group: [emp_id] if roster.get(emp_id) == (name, group) else [],
+        lambda key, emp_id, name, group: by_name.get((name, group), []),
+    )
+    won = set()
+    matched = [None] * len(winners)
+    for choices_of in stages:
+        for i, winner in enumerate(winners):
+            if matched[i] is not None:
+                continue
+            choices = choices_of(*winner)
+            emp_id = winner[1]
+            if emp_id in choices and emp_id not in won:
+                choice = emp_id
+            else:
+                choice = next((e for e in choices if e not in won), None)
+            if choice is not None:
+                won.add(choice)
+                matched[i] = choice
+    return matched
+
+# ----------------------------------------------------
+# *** สถานะการสุ่มในหน่วยความจำ (pool ต่อกลุ่ม อัปเดต O(1) ต่อผู้โชคดี) ***
+# ----------------------------------------------------
+class DrawState:
+    """ถือ emp_df / prize_df พร้อม pool ต่อกลุ่ม เพื่อสุ่มและบันทึกผู้โชคดีโดยไม่ต้อง scan ทั้งตาราง
+
+    - รหัสพนักงาน (employee ID) คือ index label ของแถวใน emp_df
+    - pools: กลุ่ม -> list ของรหัสพนักงานที่ยังพร้อมสุ่ม (ลบด้วย swap-remove จึงไม่เรียงลำดับ)
+    - pool_pos: รหัสพนักงาน -> ตำแหน่งใน pool ของกลุ่ม
+    - prize_ids / stock: กลุ่ม -> index label ใน prize_df และจำนวนคงเหลือ (เรียงตาม prize_df)
+    - prize_index: (กลุ่ม, ชื่อของขวัญ) -> ตำแหน่งใน prize_ids/stock ของกลุ่ม
+    - remaining: กลุ่ม -> จำนวนของรางวัลคงเหลือรวม
+    - group_rank: รหัสพนักงาน -> ลำดับในกลุ่มตามรายชื่อ (เริ่มที่ 1)
+    """
+
+    @instrumentation.timed('state.index')
+    def __init__(self, emp_df, prize_df):
+        self.emp_df = emp_df
+        self.prize_df = prize_df
+        self.pools = {}
+        self.pool_pos = {}
+        self.prize_ids = {}
+        self.stock = {}
+        self.prize_index = {}
+        self.remaining = {}
+
+        ranks = []
+        if not emp_df.empty:
+            groups = emp_df['กลุ่มจับรางวัล']
+            ready = emp_df['สถานะ'] == STATUS_READY
+            group_sizes = {}
+            for emp_id, group, is_ready in zip(emp_df.index, groups, ready):
+                group_clean = '' if pd.isna(group) else str(group).strip()
+                group_sizes[group_clean] = group_sizes.get(group_clean, 0) + 1
+                ranks.append(group_sizes[group_clean])
+                if not group_clean:
+                    continue
+                pool = self.pools.setdefault(group_clean, [])
+                if is_ready:
+                    self.pool_pos[emp_id] = len(pool)
+                    pool.append(emp_id)
+        # ลำดับภายในกลุ่มตามรายชื่อ (ทุกสถานะ) บันทึกลงประวัติพร้อมผู้โชคดี
+        self.group_rank = pd.Series(ranks, index=emp_df.index, dtype='int64')
+
+        if not prize_df.empty:
+            stock_lists = {}
+            for prize_id, name, group, qty in zip(prize_df.index, prize_df['ชื่อของขวัญ'],
+                                                  prize_df['กลุ่มจับรางวัล'], prize_df['จำนวนคงเหลือ']):
+                group_clean = str(group).strip()
+                ids = self.prize_ids.setdefault(group_clean, [])
+                self.prize_index.setdefault((group_clean, name), []).append(len(ids))
+                ids.append(prize_id)
+                stock_lists.setdefault(group_clean, []).append(int(qty))
+            for group_clean, stock in stock_lists.items():
+                self.stock[group_clean] = np.asarray(stock, dtype=np.int64)
+                self.remaining[group_clean] = int(self.stock[group_clean].clip(min=0).sum())
+
+    def available_ids(self, group):
+        """รหัสพนักงานที่พร้อมสุ่มของกลุ่ม เรียงตามลำดับใน emp_df (ผลสุ่มจาก seed เดิมจึงไม่เปลี่ยน)"""
+        return np.sort(np.asarray(self.pools.get(str(group).strip(), [])))
+
+    def available_prizes(self, group):
+        """(index label ใน prize_df, จำนวนคงเหลือ) ของรายการที่ยังเหลือ เรียงตาม prize_df"""
+        group_clean = str(group).strip()
+        stock = self.stock.get(group_clean)
+        if stock is None:
+            return [], []
+        slots = np.flatnonzero(stock > 0)
+        ids = self.prize_ids[group_clean]
+        return [ids[i] for i in slots], stock[slots].tolist()
+
+    def employee_keys(self, emp_ids):
+        """employee_key ของพนักงาน emp_ids"""
+        rows = self.emp_df.loc[emp_ids]
+        depts = rows['แผนก'] if 'แผนก' in rows.columns else [''] * len(rows)
+        return [employee_key(name, dept, group)
+                for name, dept, group in zip(rows['ชื่อ-นามสกุล'], depts, rows['กลุ่มจับรางวัล'])]
+
+    def roster_keys(self, emp_ids):
+        """คอลัมน์ตำแหน่งในรายชื่อ (history_store.ROSTER_COLUMNS) ของผู้โชคดี emp_ids"""
+        emp_ids = np.asarray(emp_ids)
+        return {'_emp_key': self.employee_keys(emp_ids), '_emp_id': emp_ids,
+                '_rank_within_group': self.group_rank.loc[emp_ids].to_numpy()}
+
+    def counts(self, group):
+        """(จำนวนพนักงานที่พร้อมสุ่ม, จำนวนของรางวัลคงเหลือ) ของกลุ่ม"""
+        group_clean = str(group).strip()
+        return len(self.pools.get(group_clean, [])), self.remaining.get(group_clean, 0)
+
+    def _remove_from_pool(self, emp_id, group_clean):
+        pos = self.pool_pos.pop(emp_id, None)
+        pool = self.pools.get(group_clean)
+        if pos is None or pool is None:
+            return
+        last = pool.pop()
+        if last != emp_id:
+            pool[pos] = last
+            self.pool_pos[last] = pos
+
+    def _take_prize(self, group_clean, prize, count=1):
+        """ลดของรางวัลชื่อ prize ลง count ชิ้น เริ่มจากแถวแรกที่ยังมีของเหลือ คืนจำนวนที่ลดได้"""
+        stock = self.stock.get(group_clean)
+        taken = 0
+        for slot in self.prize_index.get((group_clean, prize), []):
+            if taken == count:
+                break
+            used = int(min(count - taken, stock[slot]))
+            if used <= 0:
+                continue
+            stock[slot] -= used
+            self.prize_df.at[self.prize_ids[group_clean][slot], 'จำนวนคงเหลือ'] -= used
+            taken += used
+        if taken:
+            self.remaining[group_clean] -= taken
+        return taken
+
+    @instrumentation.timed('state.mark_winners')
+    def mark_winners(self, results):
+        """บันทึกผลการสุ่มทั้งชุด (คอลัมน์ emp_id, กลุ่มจับรางวัล, รายการของขวัญ) ในครั้งเดียว
+
+        emp_id ว่าง (ผู้โชคดีในประวัติที่ไม่อยู่ในรายชื่อแล้ว): ตัดเฉพาะของรางวัล
+        """
+        if results.empty:
+            return
+        found = results[results['emp_id'].notna()]
+        self.emp_df.loc[found['emp_id'].to_numpy(), 'สถานะ'] = STATUS_WON
+        for emp_id, group in zip(found['emp_id'], found['กลุ่มจับรางวัล']):
+            self._remove_from_pool(emp_id, str(group).strip())
+
+        taken = results.groupby(['กลุ่มจับรางวัล', 'รายการของขวัญ'], sort=False).size()
+        for (group, prize), count in taken.items():
+            self._take_prize(str(group).strip(), prize, int(count))
@@ -0,0 +1,81 @@
+import io
+import threading
+
+import pandas as pd
+import xlsxwriter
+
+try:
+    import pyarrow  # noqa: F401  (ใช้ผ่าน DataFrame.to_parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# ----------------------------------------------------
+# --- CONFIGURATION ---
+# ----------------------------------------------------
+EXPORT_COLUMNS = ['ลำดับในกลุ่ม', 'กลุ่มจับรางวัล', 'ชื่อ-นามสกุล', 'รายการของขวัญ', 'แผนก']
+SHEET_NAME = 'สรุปผลการจับรางวัล'
+
+# รูปแบบไฟล์: ชื่อที่แสดง -> (นามสกุลไฟล์, mime)
+EXPORT_FORMATS = {
+    'Excel (.xlsx)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'CSV (.csv)': ('csv', 'text/csv'),
+}
+if HAS_PARQUET:
+    EXPORT_FORMATS['Parquet (.parquet)'] = ('parquet', 'application/octet-stream')
+
+# ----------------------------------------------------
+# *** แปลงข้อมูลสำหรับดาวน์โหลด ***
+# ----------------------------------------------------
+def export_frame(df):
+    df_download = df.rename(columns={'_rank_within_group': 'ลำดับในกลุ่ม'})
+    final_cols = [col for col in EXPORT_COLUMNS if col in df_download.columns]
+    df_download = df_download[final_cols].copy()
+    if 'ลำดับในกลุ่ม' in df_download.columns:
+        df_download['ลำดับในกลุ่ม'] = pd.to_numeric(df_download['ลำดับในกลุ่ม'], errors='coerce').astype('Int64')
+    return df_download
+
+def to_excel_bytes(df):
+    """เขียน xlsx ทีละแถวด้วย constant_memory ของ xlsxwriter (หน่วยความจำคงที่แม้ประวัติยาวมาก)"""
+    df_download = export_frame(df)
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(SHEET_NAME)
+    header_format = workbook.add_format({'bold': True})
+    worksheet.write_row(0, 0, list(df_download.columns), header_format)
+    # constant_memory ต้องเขียนเรียงแถว: to_excel ของ pandas เขียนทีละคอลัมน์จึงใช้ไม่ได้
+    for row_num, row in enumerate(df_download.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_num, 0, ['' if pd.isna(v) else v for v in row])
+    workbook.close()
+    return output.getvalue()
+
+def to_csv_bytes(df):
+    return export_frame(df).to_csv(index=False).encode('utf-8-sig')
+
+def to_parquet_bytes(df):
+    output = io.BytesIO()
+    export_frame(df).to_parquet(output, index=False)
+    return output.getvalue()
+
+BUILDERS = {'xlsx': to_excel_bytes, 'csv': to_csv_bytes, 'parquet': to_parquet_bytes}
+
+# ----------------------------------------------------
+# *** Cache ไฟล์ดาวน์โหลดตามเวอร์ชันของประวัติ ***
+# ----------------------------------------------------
+# เก็บเฉพาะไฟล์ของเวอร์ชันล่าสุดต่อรูปแบบ ใช้ร่วมกันทุก session
+_cache = {}
+_cache_lock = threading.Lock()
+
+def get_cached(fmt, version):
+    with _cache_lock:
+        hit = _cache.get(fmt)
+    return hit[1] if hit is not None and hit[0] == version else None
+
+def build(fmt, version, df):
+    """สร้างไฟล์ (เมื่อผู้ใช้ขอ) แล้ว cache ไว้จนกว่าประวัติจะเปลี่ยนเวอร์ชัน"""
+    data = get_cached(fmt, version)
+    if data is None:
+        data = BUILDERS[fmt](df)
+        with _cache_lock:
+            _cache[fmt] = (version, data)
+    return data
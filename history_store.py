@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+import instrumentation
+
+# ----------------------------------------------------
+# --- CONFIGURATION & FILE PATHS ---
+# ----------------------------------------------------
+HISTORY_FILE = 'draw_history.csv'
+JOURNAL_FILE = 'draw_history.journal'
+HISTORY_COLUMNS = ['ชื่อ-นามสกุล', 'แผนก', 'รายการของขวัญ', 'กลุ่มจับรางวัล']
+# คอลัมน์สำหรับตรวจสอบย้อนหลัง: seed ของงาน, ลำดับรอบการสุ่ม, เป็นการสุ่มทุกกลุ่มหรือไม่
+AUDIT_COLUMNS = ['_seed', '_draw_no', '_batch']
+# ผู้โชคดีในรายชื่อ: _emp_key (draw_state.employee_key คงที่แม้นำเข้ารายชื่อใหม่) ใช้ระบุตัวคน
+# _emp_id (แถวใน employees.csv) และลำดับภายในกลุ่ม ณ เวลาที่สุ่ม ใช้เรียง/แสดงลำดับ
+# หน้าผลรางวัลจึงไม่ต้อง merge กับรายชื่อ (ชื่อซ้ำก็ไม่ทำให้แถวเพิ่ม)
+ROSTER_COLUMNS = ['_emp_key', '_emp_id', '_rank_within_group']
+
+# ----------------------------------------------------
+# *** Journal แบบเขียนต่อท้าย (append-only) ***
+# ----------------------------------------------------
+# แต่ละบรรทัดคือ JSON หนึ่งรายการ: {"seq": ลำดับในประวัติ, "record": {...}}
+# seq คือตำแหน่งของรายการในประวัติทั้งหมด (เริ่มที่ 0) ใช้กันข้อมูลซ้ำ
+# กรณีโปรแกรมล่มระหว่างรวม journal เข้า CSV
+
+@instrumentation.timed('history.journal_append')
+def append_records(start_seq, records):
+    """เขียนผู้โชคดีทั้งรอบต่อท้าย journal แล้ว fsync ครั้งเดียว"""
+    if not records:
+        return
+    lines = [json.dumps({'seq': start_seq + i, 'record': record}, ensure_ascii=False)
+             for i, record in enumerate(records)]
+    with open(JOURNAL_FILE, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def parse_journal_line(line):
+    """(seq, record) ของบรรทัดใน journal หรือ None ถ้าบรรทัดว่าง/เขียนไม่ครบ"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+        return int(entry['seq']), entry['record']
+    except (ValueError, KeyError, TypeError):
+        # บรรทัดที่เขียนค้างตอนเครื่องล่ม
+        return None
+
+def read_journal():
+    """อ่าน journal คืนค่าเป็น list ของ (seq, record) ข้ามบรรทัดสุดท้ายที่เขียนไม่ครบ"""
+    entries = []
+    if not os.path.exists(JOURNAL_FILE):
+        return entries
+    with open(JOURNAL_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = parse_journal_line(line)
+            if entry is not None:
+                entries.append(entry)
+    return entries
+
+# ----------------------------------------------------
+# *** บันทึก / โหลด ประวัติ ***
+# ----------------------------------------------------
+# CSV ที่ process นี้เขียนล่าสุด: ถ้าไฟล์ยังตรงกับ signature นี้ การรวม journal
+# ต่อท้ายเฉพาะแถวใหม่ได้ (ไฟล์เดิมไม่ถูกเขียนทับ ผู้อ่านแบบ byte offset จึงอ่านต่อได้)
+_saved = {'signature': None, 'rows': 0, 'columns': None}
+_save_lock = threading.Lock()
+
+def _csv_signature():
+    try:
+        stat = os.stat(HISTORY_FILE)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _remember_saved(rows, columns):
+    _saved.update(signature=_csv_signature(), rows=rows, columns=columns)
+
+@instrumentation.timed('history.save_csv')
+def save_history(history_list):
+    """เขียนประวัติทั้งหมดลง CSV แบบ atomic (เขียนไฟล์ชั่วคราวแล้ว replace)"""
+    df_history = pd.DataFrame(history_list) if history_list else pd.DataFrame(columns=HISTORY_COLUMNS)
+    tmp_file = HISTORY_FILE + '.tmp'
+    with _save_lock:
+        try:
+            df_history.to_csv(tmp_file, index=False, encoding='utf_8_sig')
+            os.replace(tmp_file, HISTORY_FILE)
+            _remember_saved(len(df_history), list(df_history.columns))
+            return True
+        except Exception as e:
+            print(f"ERROR: {e}")
+            return False
+
+def _append_history(history_list):
+    """ต่อท้าย CSV ด้วยแถวที่ยังไม่ได้บันทึก คืน False ถ้าต่อท้ายไม่ได้ (ต้องเขียนใหม่ทั้งไฟล์)"""
+    if _saved['signature'] is None or _saved['signature'] != _csv_signature():
+        return False
+    if len(history_list) < _saved['rows']:
+        return False
+    new_records = history_list[_saved['rows']:]
+    if not new_records:
+        return True
+    df_new = pd.DataFrame(new_records)
+    if not set(df_new.columns) <= set(_saved['columns']):
+        # มีคอลัมน์ใหม่ที่ header เดิมไม่มี
+        return False
+    try:
+        with open(HISTORY_FILE, 'a', encoding='utf-8', newline='') as f:
+            df_new.reindex(columns=_saved['columns']).to_csv(f, header=False, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+    except OSError as e:
+        print(f"ERROR: {e}")
+        return False
+    _remember_saved(len(history_list), _saved['columns'])
+    return True
+
+@instrumentation.timed('history.compact')
+def compact(history_list):
+    """รวม journal เข้า CSV แล้วล้าง journal (ล้างเฉพาะเมื่อเขียน CSV สำเร็จ)
+
+    ปกติต่อท้าย CSV เฉพาะแถวใหม่ เขียนใหม่ทั้งไฟล์เมื่อไฟล์ถูกแก้จากที่อื่นหรือคอลัมน์เปลี่ยน
+    """
+    with _save_lock:
+        saved = _append_history(history_list)
+    if not saved:
+        saved = save_history(history_list)
+    if saved and os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, 'w', encoding='utf-8'):
+            pass
+
+def pending_records(saved_count):
+    """รายการใน journal ที่ยังไม่อยู่ใน CSV (CSV มีอยู่แล้ว saved_count แถว)"""
+    pending = []
+    for seq, record in read_journal():
+        if seq >= saved_count + len(pending):
+            pending.append(record)
+    return pending
+
+def last_draw_audit(history_list):
+    """seed ล่าสุดและลำดับรอบการสุ่มถัดไปจากประวัติ คืน (None, 0) ถ้ายังไม่มีข้อมูล"""
+    seed, last_draw_no = None, -1
+    for record in history_list:
+        rec_seed, rec_draw_no = record.get('_seed'), record.get('_draw_no')
+        if pd.notna(rec_seed) and pd.notna(rec_draw_no):
+            seed = int(rec_seed)
+            last_draw_no = max(last_draw_no, int(rec_draw_no))
+    return seed, last_draw_no + 1
+
+def clear_history():
+    with _save_lock:
+        for path in (HISTORY_FILE, JOURNAL_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        _saved.update(signature=None, rows=0, columns=None)
@@ -0,0 +1,115 @@
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+
+try:
+    import pyinstrument
+except ImportError:  # ไม่มี pyinstrument: ใช้ cProfile แทน
+    pyinstrument = None
+
+# ----------------------------------------------------
+# *** ตัวจับเวลา / ตัวนับ ระดับ process ***
+# ----------------------------------------------------
+# ทุก session ใช้ชุดเดียวกัน ดูได้ที่หน้า Admin และส่งออกเป็น JSON ระหว่างซ้อมงาน
+# ต้นทุนต่อครั้งคือ perf_counter สองครั้ง + lock สั้นๆ จึงเปิดไว้ตลอด
+
+_timers = {}
+_counters = {}
+_lock = threading.Lock()
+_started_at = time.time()
+
+def record(name, seconds):
+    with _lock:
+        stat = _timers.get(name)
+        if stat is None:
+            stat = _timers[name] = {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0}
+        stat['count'] += 1
+        stat['total'] += seconds
+        stat['last'] = seconds
+        if seconds > stat['max']:
+            stat['max'] = seconds
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+@contextlib.contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def timed(name):
+    """decorator: จับเวลาทุกครั้งที่ฟังก์ชันถูกเรียก"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def snapshot():
+    """สำเนาของตัวจับเวลา (วินาที) และตัวนับทั้งหมด"""
+    with _lock:
+        timers = {name: dict(stat, mean=stat['total'] / stat['count']) for name, stat in _timers.items()}
+        counters = dict(_counters)
+    return {'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(_started_at)),
+            'timers': timers, 'counters': counters}
+
+def to_json():
+    return json.dumps(snapshot(), ensure_ascii=False, indent=2)
+
+def reset():
+    global _started_at
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _started_at = time.time()
+
+# ----------------------------------------------------
+# *** Profiler (เปิดจาก sidebar ทีละ script run) ***
+# ----------------------------------------------------
+# ผล profile ล่าสุดของทั้ง process (ข้อความ) แสดงในหน้า Admin
+PROFILE_TOP = 40
+_last_profile = {'text': None, 'engine': None, 'at': None}
+
+@contextlib.contextmanager
+def profile(enabled=True):
+    """profile โค้ดในบล็อก (ใช้ pyinstrument ถ้าติดตั้งไว้ ไม่งั้นใช้ cProfile)"""
+    if not enabled:
+        yield
+        return
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            _store_profile(profiler.output_text(unicode=True), 'pyinstrument')
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        _store_profile(out.getvalue(), 'cProfile')
+
+def _store_profile(text, engine):
+    with _lock:
+        _last_profile.update(text=text, engine=engine, at=time.strftime('%H:%M:%S'))
+
+def last_profile():
+    with _lock:
+        return dict(_last_profile)
@@ -0,0 +1,17 @@
+import streamlit as st
+
+import data_store
+
+# ตรวจผลรางวัลใหม่ทุกกี่วินาที (หน้าจอ projector)
+LIVE_REFRESH_SECONDS = 1
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def watch_results(rendered_token):
+    """rerun ทั้งหน้าเมื่อผลรางวัลเปลี่ยนจากตอนที่แสดงผล
+
+    ทุกรอบ data_store.results_token() ตรวจ draw_events ในหน่วยความจำ และ stat ไฟล์ประวัติ/journal/รายชื่อ
+    (ผลรางวัลจาก process อื่น) อ่านเฉพาะไบต์ที่ต่อท้ายมาใหม่ ครั้งเดียวต่อ process เพราะ index ใช้ร่วมกันทุก session
+    เมื่อมีผลใหม่ หน้าจอ rerun ทั้งหน้าแล้ววาดผลใหม่จาก index ในหน่วยความจำ (ไม่ parse ประวัติทั้งไฟล์)
+    """
+    if data_store.results_token() != rendered_token:
+        st.rerun()
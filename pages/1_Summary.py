@@ -1,88 +1,75 @@
 import streamlit as st
 import pandas as pd
-import os
-import io
+import html
+import time
 
-# ----------------------------------------------------
-# --- CONFIGURATION & FILE PATHS ---
-# ----------------------------------------------------
-HISTORY_FILE = 'draw_history.csv'
-EMPLOYEE_FILE = 'employees.csv' 
+import data_store
+import exports
+import instrumentation
+import live_view
+
+_render_started = time.perf_counter()
 
 # ----------------------------------------------------
-# *** ฟังก์ชันผู้ช่วย: Load Data Helper (History) ***
+# *** ฟังก์ชันผู้ช่วย: Load Results (ใช้ index ผลรางวัลร่วมกับหน้ารายกลุ่ม) ***
 # ----------------------------------------------------
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        try:
-            encodings = ['utf-8-sig', 'utf-8', 'cp874', 'latin1']
-            df = None
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(HISTORY_FILE, encoding=encoding)
-                    break
-                except Exception:
-                    continue
-            
-            if df is None:
-                st.error(f"ไม่สามารถอ่านไฟล์ประวัติ {HISTORY_FILE} ได้")
-                return pd.DataFrame()
-
-            required_cols = ['ชื่อ-นามสกุล', 'รายการของขวัญ', 'กลุ่มจับรางวัล', 'แผนก']
-            for col in required_cols:
-                if col not in df.columns:
-                    df[col] = ''
-            
-            df['ชื่อ-นามสกุล'] = df['ชื่อ-นามสกุล'].astype(str).str.strip() 
-            return df.fillna('')
-        except Exception as e:
-            st.error(f"Error: {e}")
-            return pd.DataFrame()
-    return pd.DataFrame()
+def load_results():
+    results_index = data_store.load_results_index()
+    if not results_index:
+        return pd.DataFrame()
+    df = pd.concat([results_index[g] for g in sorted(results_index)], ignore_index=True)
+    return df.drop(columns=['ลำดับที่'])
 
 # ----------------------------------------------------
-# *** ฟังก์ชันผู้ช่วย: Load Data Helper (Employees) ***
+# *** ฟังก์ชันผู้ช่วย: สร้าง HTML การ์ด (หนึ่งบล็อกต่อกลุ่ม) ***
 # ----------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_employees_for_merge():
-    if os.path.exists(EMPLOYEE_FILE):
-        try:
-            encodings = ['utf-8-sig', 'utf-8', 'cp874', 'latin1']
-            df = None
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(EMPLOYEE_FILE, encoding=encoding)
-                    break
-                except Exception:
-                    continue
-
-            if df is None: return pd.DataFrame()
-            
-            if 'ชื่อ-นามสกุล' in df.columns and 'กลุ่มจับรางวัล' in df.columns:
-                df['ชื่อ-นามสกุล'] = df['ชื่อ-นามสกุล'].astype(str).str.strip()
-                df['กลุ่มจับรางวัล'] = df['กลุ่มจับรางวัล'].astype(str).str.strip()
-                df['_original_order'] = df.index
-                df['_rank_within_group'] = df.groupby('กลุ่มจับรางวัล')['_original_order'].rank(method='dense', ascending=True).astype(int)
-                return df[['ชื่อ-นามสกุล', 'กลุ่มจับรางวัล', '_original_order', '_rank_within_group']]
-            return pd.DataFrame()
-        except:
-            return pd.DataFrame()
-    return pd.DataFrame()
+CARDS_PER_PAGE = 200
+
+def format_rank(rank_value):
+    return int(float(rank_value)) if str(rank_value).strip() not in ['-', '', 'nan'] else '-'
+
+def render_group_block(group, df_group):
+    """HTML ของหนึ่งกลุ่ม: หัวข้อกลุ่ม + การ์ดทุกใบใน grid เดียว (ส่งไปเบราว์เซอร์เป็น element เดียว)"""
+    ranks = df_group['_rank_within_group'] if '_rank_within_group' in df_group.columns else ['-'] * len(df_group)
+    depts = df_group['แผนก'] if 'แผนก' in df_group.columns else ['N/A'] * len(df_group)
+    cards = []
+    for rank_value, prize, name, dept in zip(ranks, df_group['รายการของขวัญ'], df_group['ชื่อ-นามสกุล'], depts):
+        cards.append(f"""
+        <div class="prize-card">
+            <div class="prize-header">
+                <span class="prize-rank">ลำดับที่ {format_rank(rank_value)}</span>
+                <span class="prize-name">🎁 {html.escape(str(prize))}</span>
+            </div>
+            <div>
+                <span class="winner-name">👤 {html.escape(str(name))}</span><br>
+                <span class="group-info">🏢 แผนก: {html.escape(str(dept))}</span>
+            </div>
+        </div>""")
+    return (f'<div class="group-separator">➡️ กลุ่มจับรางวัล: {html.escape(str(group))}</div>'
+            f'<div class="prize-grid">{"".join(cards)}</div>')
 
 # ----------------------------------------------------
-# *** ฟังก์ชันผู้ช่วย: to_excel_bytes ***
+# *** ฟังก์ชันผู้ช่วย: ดาวน์โหลด (สร้างไฟล์เมื่อกดขอเท่านั้น) ***
 # ----------------------------------------------------
-def to_excel_bytes(df):
-    cols_to_keep = ['ลำดับในกลุ่ม', 'กลุ่มจับรางวัล', 'ชื่อ-นามสกุล', 'รายการของขวัญ', 'แผนก']
-    df_download = df.rename(columns={'_rank_within_group': 'ลำดับในกลุ่ม'})
-    df_download = df_download.drop(columns=['_original_order'], errors='ignore')
-    final_cols = [col for col in cols_to_keep if col in df_download.columns]
-    df_download = df_download[final_cols]
-    
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_download.to_excel(writer, index=False, sheet_name='สรุปผลการจับรางวัล')
-    return output.getvalue()
+def render_download(df):
+    version = data_store.results_version()
+    label = st.radio("รูปแบบไฟล์สรุปผล", list(exports.EXPORT_FORMATS), horizontal=True)
+    fmt, mime = exports.EXPORT_FORMATS[label]
+
+    data = exports.get_cached(fmt, version)
+    if data is None and st.button("📦 เตรียมไฟล์สรุปรายชื่อผู้ได้รับรางวัล", use_container_width=True):
+        with st.spinner("กำลังสร้างไฟล์..."):
+            data = exports.build(fmt, version, df)
+
+    if data is not None:
+        st.download_button(
+            label=f"⬇️ ดาวน์โหลดสรุปรายชื่อผู้ได้รับรางวัล ({label})",
+            data=data,
+            file_name=f'prize_summary_{pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")}.{fmt}',
+            mime=mime,
+            use_container_width=True,
+            type="primary"
+        )
 
 # ----------------------------------------------------
 # --- Main Program (Streamlit UI) ---
@@ -146,72 +133,46 @@ st.markdown("""
     border-bottom: 2px solid #ffd700;
     padding-bottom: 5px;
 }
+
+/* การ์ดทั้งกลุ่มอยู่ใน grid เดียว (แทน st.columns ต่อการ์ด) */
+.prize-grid {
+    display: grid;
+    grid-template-columns: repeat(2, minmax(0, 1fr));
+    column-gap: 20px;
+}
 </style>
 """, unsafe_allow_html=True)
 
 st.title("🏆 หน้าสรุปผลรางวัลรวมทั้งหมด")
 st.markdown("---")
 
-df_history = load_history()
+results_token = data_store.results_token()
+df_display = load_results()
+live_view.watch_results(results_token)
 
-if df_history.empty or df_history['รายการของขวัญ'].dropna().empty:
+if df_display.empty or (df_display['รายการของขวัญ'] == '').all():
     st.warning("ยังไม่มีข้อมูลการสุ่มรางวัล")
 else:
-    df_employees = load_employees_for_merge()
-    if not df_employees.empty:
-        df_merged = pd.merge(df_history, df_employees, on='ชื่อ-นามสกุล', how='left', suffixes=('_hist', '_emp'))
-        df_display = df_merged.sort_values(
-            by=['กลุ่มจับรางวัล_hist', '_rank_within_group'], 
-            na_position='last'
-        ).reset_index(drop=True)
-        df_display = df_display.rename(columns={'กลุ่มจับรางวัล_hist': 'กลุ่มจับรางวัล'}).drop(columns=['กลุ่มจับรางวัล_emp'], errors='ignore')
-    else:
-        df_display = df_history.sort_values(by=['กลุ่มจับรางวัล', 'รายการของขวัญ']).reset_index(drop=True)
-
     # ปุ่มดาวน์โหลด
-    st.download_button(
-        label="⬇️ ดาวน์โหลดสรุปรายชื่อผู้ได้รับรางวัล (Excel .xlsx)",
-        data=to_excel_bytes(df_display), 
-        file_name=f'prize_summary_{pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")}.xlsx',
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        use_container_width=True,
-        type="primary"
-    )
+    render_download(df_display)
     
     st.markdown("---")
     st.header(f"📋 รายชื่อผู้โชคดีทั้งหมด ({len(df_display)} รายการ)")
     
-    current_group = None
-    
-    # วนลูปแสดงผล
-    for i in range(len(df_display)):
-        row = df_display.iloc[i]
-        
-        # แสดงหัวข้อกลุ่ม (ใช้ตัวคั่นแบบเต็มความกว้าง)
-        if row['กลุ่มจับรางวัล'] != current_group:
-            current_group = row['กลุ่มจับรางวัล']
-            st.markdown(f'<div class="group-separator">➡️ กลุ่มจับรางวัล: {current_group}</div>', unsafe_allow_html=True)
-            # สร้างคอลัมน์ใหม่สำหรับแต่ละกลุ่ม
-            cols = st.columns(2)
-            col_ptr = 0
-
-        rank_value = row['_rank_within_group'] if '_rank_within_group' in row else '-'
-        
-        card_html = f"""
-        <div class="prize-card">
-            <div class="prize-header">
-                <span class="prize-rank">ลำดับที่ {int(float(rank_value)) if str(rank_value).strip() not in ['-', '', 'nan'] else '-'}</span>
-                <span class="prize-name">🎁 {row['รายการของขวัญ']}</span>
-            </div>
-            <div>
-                <span class="winner-name">👤 {row['ชื่อ-นามสกุล']}</span><br>
-                <span class="group-info">🏢 แผนก: {row.get('แผนก', 'N/A')}</span>
-            </div>
-        </div>
-        """
-        
-        # วาง Card ลงในคอลัมน์ซ้าย/ขวา สลับกัน
-        with cols[i % 2]:
-            st.markdown(card_html, unsafe_allow_html=True)
+    # แบ่งหน้า: ส่ง HTML ไปเบราว์เซอร์ไม่เกิน CARDS_PER_PAGE ใบต่อครั้ง
+    n_pages = max(1, -(-len(df_display) // CARDS_PER_PAGE))
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"หน้า (ทั้งหมด {n_pages} หน้า)", min_value=1, max_value=n_pages, value=1, step=1)
+    start = (page - 1) * CARDS_PER_PAGE
+    df_page = df_display.iloc[start:start + CARDS_PER_PAGE]
+    if n_pages > 1:
+        st.caption(f"แสดงรายการที่ {start + 1}-{start + len(df_page)} จาก {len(df_display)}")
+
+    # วนลูปแสดงผลทีละกลุ่ม (หนึ่ง st.markdown ต่อกลุ่ม)
+    for group, df_group in df_page.groupby('กลุ่มจับรางวัล', sort=False):
+        st.markdown(render_group_block(group, df_group), unsafe_allow_html=True)
         
     st.markdown("---")
+
+instrumentation.record('render.summary', time.perf_counter() - _render_started)
@@ -0,0 +1,108 @@
+import html
+
+import streamlit as st
+
+import data_store
+import live_view
+import qr_assets
+
+# ----------------------------------------------------
+# *** หน้าผลรางวัลรายกลุ่ม: เลือกกลุ่มจาก employees.csv หรือ ?group=<ชื่อกลุ่ม> ***
+# ----------------------------------------------------
+def select_group(groups):
+    """กลุ่มที่เลือก: ใช้ค่าจาก URL (?group=) ก่อน และเขียนกลับลง URL เพื่อให้แชร์/สแกนได้"""
+    requested = st.query_params.get('group')
+    index = groups.index(requested) if requested in groups else 0
+    group = st.sidebar.selectbox("🎯 เลือกกลุ่มจับรางวัล", groups, index=index)
+    if st.query_params.get('group') != group:
+        st.query_params['group'] = group
+    return group
+
+def render_winner_grid(df_group):
+    """HTML การ์ดผู้โชคดีทุกคนของกลุ่มใน grid เดียว (ส่งไปเบราว์เซอร์เป็น element เดียว)
+
+    ชื่อ/ของรางวัล/แผนกมาจากไฟล์ที่นำเข้า จึง escape ก่อนใส่ใน HTML
+    """
+    depts = df_group['แผนก'] if 'แผนก' in df_group.columns else ['N/A'] * len(df_group)
+    cards = []
+    for rank_value, prize, name, dept in zip(df_group['ลำดับที่'], df_group['รายการของขวัญ'],
+                                             df_group['ชื่อ-นามสกุล'], depts):
+        cards.append(f"""
+        <div class="winner-card">
+            <span class="card-prize">🎁 {html.escape(str(prize))}</span>
+            <div class="card-name">👤 {html.escape(str(name))}</div>
+            <div class="card-detail">🏢 แผนก: {html.escape(str(dept))}</div>
+            <div class="card-rank-corner">ลำดับที่ {html.escape(str(rank_value))}</div>
+        </div>""")
+    return f'<div class="winner-grid">{"".join(cards)}</div>'
+
+def main():
+    st.set_page_config(layout="wide", page_title="ผลรางวัลรายกลุ่ม")
+
+    groups = data_store.load_group_names()
+    if not groups:
+        st.info("ยังไม่มีข้อมูลกลุ่มจับรางวัลในรายชื่อพนักงาน")
+        return
+    group_name = select_group(groups)
+
+    # QR Code Sidebar
+    group_url = qr_assets.group_page_url(group_name)
+
+    with st.sidebar:
+        st.header(f"🎟️ QR Code: {group_name}")
+        st.image(qr_assets.qr_svg(group_url), use_container_width=True)
+        st.markdown(f"**URL:** `{group_url}`")
+        st.download_button("⬇️ ดาวน์โหลด QR (PNG)", qr_assets.qr_png(group_url),
+                           file_name=f"qr_{group_name}.png", mime="image/png", use_container_width=True)
+
+    # CSS Styles
+    st.markdown("""
+        <style>
+        .winner-card {
+            background-color: #1e2124;
+            border-radius: 10px;
+            padding: 20px;
+            margin-bottom: 20px;
+            box-shadow: 0 4px 8px rgba(0,0,0,0.4);
+            border-left: 5px solid #ff9900;
+            position: relative;
+            min-height: 150px;
+        }
+        .card-prize { color: #ffeb3b; font-size: 1.8em; font-weight: bold; margin-bottom: 10px; display: block; }
+        .card-name { color: #4beaff; font-size: 1.7em; font-weight: bold; }
+        .card-detail { color: #c9c9c9; font-size: 0.9em; margin-top: 5px; }
+        .card-rank-corner {
+            position: absolute;
+            right: 15px;
+            bottom: 10px;
+            font-size: 0.9em;
+            color: #ff4b4b;
+            font-weight: bold;
+            background: rgba(255,255,255,0.1);
+            padding: 2px 10px;
+            border-radius: 5px;
+        }
+        .winner-grid {
+            display: grid;
+            grid-template-columns: repeat(2, minmax(0, 1fr));
+            column-gap: 20px;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+    st.title(f"🎉 ผลรางวัลกลุ่ม: {group_name}")
+    st.markdown("---")
+
+    # Data Processing (ใช้ผลที่คำนวณไว้แล้วร่วมกันทุกกลุ่ม)
+    results_token = data_store.results_token()
+    df_summary = data_store.load_results_index().get(group_name)
+    live_view.watch_results(results_token)
+
+    # Display Result
+    if df_summary is not None and not df_summary.empty:
+        st.markdown(render_winner_grid(df_summary), unsafe_allow_html=True)
+    else:
+        st.info("ยังไม่มีข้อมูลผลรางวัลในกลุ่มนี้")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+
+# ----------------------------------------------------
+# *** หน้าผู้ดูแลระบบ: เวลาที่ใช้ในแต่ละขั้นตอน / ตัวนับ / ผล profile ล่าสุด ***
+# ----------------------------------------------------
+def timers_frame(timers):
+    if not timers:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_dict(timers, orient='index')
+    df = df[['count', 'total', 'mean', 'max', 'last']]
+    df[['total', 'mean', 'max', 'last']] = (df[['total', 'mean', 'max', 'last']] * 1000).round(2)
+    df.columns = ['จำนวนครั้ง', 'รวม (ms)', 'เฉลี่ย (ms)', 'สูงสุด (ms)', 'ล่าสุด (ms)']
+    return df.sort_values('รวม (ms)', ascending=False)
+
+def main():
+    st.set_page_config(layout="wide", page_title="Admin: ประสิทธิภาพ")
+    st.title("🩺 ประสิทธิภาพของระบบ")
+
+    stats = instrumentation.snapshot()
+    st.caption(f"สถิติสะสมตั้งแต่ {stats['since']} (ทุก session ใน process นี้)")
+
+    col_json, col_reset = st.columns(2)
+    with col_json:
+        st.download_button("⬇️ ส่งออกเป็น JSON", instrumentation.to_json(), file_name="instrumentation.json",
+                           mime="application/json", use_container_width=True)
+    with col_reset:
+        if st.button("♻️ เริ่มนับใหม่", use_container_width=True):
+            instrumentation.reset()
+            st.rerun()
+
+    st.subheader("⏱️ ตัวจับเวลา")
+    df_timers = timers_frame(stats['timers'])
+    if df_timers.empty:
+        st.info("ยังไม่มีข้อมูล")
+    else:
+        st.dataframe(df_timers, use_container_width=True)
+
+    st.subheader("🔢 ตัวนับ")
+    if stats['counters']:
+        st.dataframe(pd.Series(stats['counters'], name='จำนวน').sort_index(), use_container_width=True)
+    else:
+        st.info("ยังไม่มีข้อมูล")
+
+    st.subheader("🔬 Profile ล่าสุด")
+    profile = instrumentation.last_profile()
+    if profile['text']:
+        st.caption(f"{profile['engine']} เวลา {profile['at']} (เปิด/ปิดได้ที่ sidebar ของหน้าหลัก)")
+        st.code(profile['text'], language=None)
+    else:
+        st.info("ยังไม่มีผล profile: เปิด 'Profile การทำงานของหน้านี้' ที่ sidebar ของหน้าหลักแล้วกดสุ่ม")
+
+if __name__ == "__main__":
+    main()
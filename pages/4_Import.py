@@ -0,0 +1,59 @@
+import streamlit as st
+
+import data_store
+import draw_coordinator
+import roster_import
+
+# ----------------------------------------------------
+# *** หน้านำเข้ารายชื่อพนักงาน / ของรางวัล (Excel หรือ CSV) ***
+# ----------------------------------------------------
+LABELS = {
+    'employees': "👥 รายชื่อพนักงาน",
+    'prizes': "🎁 ของรางวัล",
+}
+
+def render_import(kind):
+    spec = roster_import.KINDS[kind]
+    st.subheader(LABELS[kind])
+    st.caption("คอลัมน์ที่ต้องมี: " + ", ".join(spec['required']) + f" (เขียนทับ {spec['path']})")
+    upload = st.file_uploader("เลือกไฟล์", type=['xlsx', 'xlsm', 'csv'], key=f"upload_{kind}")
+    if upload is None:
+        return
+    # file_uploader ยังถือไฟล์เดิมหลัง rerun: นำเข้าเฉพาะไฟล์ที่ยังไม่เคยนำเข้า
+    if st.session_state.get(f"imported_{kind}") == upload.file_id:
+        st.success("นำเข้าไฟล์นี้แล้ว")
+        return
+    if not st.button("📥 นำเข้า", key=f"import_{kind}", use_container_width=True):
+        return
+
+    with st.spinner("กำลังนำเข้า..."):
+        summary = roster_import.import_file(kind, upload, upload.name)
+    if summary['missing']:
+        st.error("คอลัมน์ไม่ครบ: " + ", ".join(summary['missing']))
+        return
+    if not summary['ok']:
+        st.error("ไม่มีข้อมูลให้นำเข้า หรือเขียนไฟล์ไม่ได้")
+        return
+    draw_coordinator.reload_roster()
+    st.session_state[f"imported_{kind}"] = upload.file_id
+    st.success(f"นำเข้า {summary['imported']:,} จาก {summary['rows']:,} แถว "
+               f"(ข้อมูลไม่ครบ {summary['skipped']:,} แถว, ซ้ำ {summary['duplicates']:,} แถว)")
+    if summary['suspected']:
+        st.warning("ชื่อซ้ำในกลุ่มเดียวกันแต่ข้อมูลต่างกัน (นำเข้าทุกแถว กรุณาตรวจสอบ): "
+                   + ", ".join(summary['suspected']))
+
+def main():
+    st.set_page_config(layout="wide", page_title="นำเข้ารายชื่อ")
+    st.title("📥 นำเข้ารายชื่อ / ของรางวัล")
+
+    if data_store.load_history_records():
+        st.warning("มีประวัติการสุ่มอยู่แล้ว: ควรล้างประวัติที่หน้าหลักก่อนนำเข้ารายชื่อชุดใหม่")
+
+    col_emp, col_prize = st.columns(2)
+    with col_emp:
+        render_import('employees')
+    with col_prize:
+        render_import('prizes')
+
+if __name__ == "__main__":
+    main()
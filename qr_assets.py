@@ -0,0 +1,89 @@
+import functools
+import hashlib
+import io
+import os
+from urllib.parse import quote
+
+import qrcode
+
+# ----------------------------------------------------
+# --- CONFIGURATION ---
+# ----------------------------------------------------
+APP_BASE_URL = "https://lws-draw-app-final.streamlit.app"
+GROUP_PAGE = "Group_Results"
+# QR ที่สร้างแล้วเก็บลงดิสก์ ให้ process ใหม่ไม่ต้องสร้างซ้ำ
+QR_CACHE_DIR = os.path.join('static', 'qr')
+
+def group_page_url(group):
+    return f"{APP_BASE_URL}/{GROUP_PAGE}?group={quote(group)}"
+
+# ----------------------------------------------------
+# *** สร้าง QR (cache ในหน่วยความจำ + ดิสก์ ตาม URL) ***
+# ----------------------------------------------------
+def _make_qr(url):
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr
+
+def _cache_file(url, ext):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(QR_CACHE_DIR, f"{digest}.{ext}")
+
+def _read_or_build(url, ext, build):
+    path = _cache_file(url, ext)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    data = build()
+    try:
+        os.makedirs(QR_CACHE_DIR, exist_ok=True)
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+    except OSError as e:
+        print(f"ERROR: บันทึก QR ลงดิสก์ไม่ได้: {e}")
+    return data
+
+@functools.lru_cache(maxsize=256)
+def qr_png(url):
+    """PNG bytes ของ QR (สร้างด้วย PIL ครั้งเดียวต่อ URL)"""
+    def build():
+        img = _make_qr(url).make_image(fill_color="black", back_color="white")
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+    return _read_or_build(url, 'png', build)
+
+def _matrix_to_svg(matrix):
+    # หนึ่ง path ต่อทั้งภาพ: รวมจุดดำที่ติดกันในแถวเดียวเป็นสี่เหลี่ยมเดียว
+    size = len(matrix)
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            parts.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+            f'<rect width="{size}" height="{size}" fill="#fff"/><path d="{"".join(parts)}"/></svg>')
+
+@functools.lru_cache(maxsize=256)
+def qr_svg(url):
+    """SVG ของ QR เป็นข้อความ (ไม่ต้องใช้ PIL และคมชัดทุกขนาดจอ)"""
+    def build():
+        return _matrix_to_svg(_make_qr(url).get_matrix()).encode('utf-8')
+    return _read_or_build(url, 'svg', build).decode('utf-8')
+
+def pregenerate(urls):
+    """สร้าง QR ทั้ง PNG และ SVG ล่วงหน้า (เรียกตอนเริ่มโปรแกรม)"""
+    for url in urls:
+        qr_png(url)
+        qr_svg(url)
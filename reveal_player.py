@@ -0,0 +1,67 @@
+import threading
+import time
+
+# ----------------------------------------------------
+# *** เปิดเผยผู้โชคดีหลังบันทึกผลแล้ว (ไม่บล็อก script) ***
+# ----------------------------------------------------
+# ผลการสุ่มถูกบันทึกครบก่อนเริ่มเปิดเผย การเปิดเผยจึงเป็นแค่การแสดงผล
+# ตำแหน่งปัจจุบันคำนวณจากเวลาที่เริ่มและความเร็ว (ไม่ได้นับในลูป) จึงเล่นต่อได้ถูกต้อง
+# แม้ browser reconnect หรือโหลดหน้าใหม่ (หน้าเว็บระบุรอบด้วย ?reveal=<draw_no>)
+
+# เก็บรอบที่เปิดเผยล่าสุดไว้เท่านี้ (เก่ากว่านี้ถือว่าจบแล้ว)
+MAX_REVEALS = 50
+
+_reveals = {}
+_lock = threading.Lock()
+
+def start(draw_no, group, names, prizes, speed, page_size=1):
+    """ลงทะเบียนการเปิดเผยรอบ draw_no (names/prizes เรียงตามลำดับที่จะแสดง)
+
+    page_size > 1: เปิดเผยทีละหน้า หน้าละ page_size คน (หนึ่งหน้าต่อ speed วินาที)
+    """
+    with _lock:
+        _reveals[draw_no] = {
+            'group': group,
+            'names': list(names),
+            'prizes': list(prizes),
+            'speed': float(speed),
+            'page_size': max(1, int(page_size)),
+            'started_at': time.time(),
+            'skipped': False,
+        }
+        for old in sorted(_reveals)[:-MAX_REVEALS]:
+            del _reveals[old]
+
+def get(draw_no):
+    with _lock:
+        return _reveals.get(draw_no)
+
+def skip(draw_no):
+    """ข้ามไปคนสุดท้ายทันที"""
+    with _lock:
+        if draw_no in _reveals:
+            _reveals[draw_no]['skipped'] = True
+
+def page_count(reveal):
+    return -(-len(reveal['names']) // reveal['page_size'])
+
+def shown_pages(reveal, now=None):
+    """จำนวนหน้าที่เปิดเผยแล้ว ณ เวลา now (หน้าแรกแสดงทันที; page_size=1 คือจำนวนคน)"""
+    pages = page_count(reveal)
+    if reveal['skipped']:
+        return pages
+    now = time.time() if now is None else now
+    return min(pages, int((now - reveal['started_at']) / reveal['speed']) + 1)
+
+def current_page(reveal, now=None):
+    """(ตำแหน่งเริ่ม, names, prizes) ของหน้าที่กำลังแสดง"""
+    start = (shown_pages(reveal, now) - 1) * reveal['page_size']
+    end = start + reveal['page_size']
+    return start, reveal['names'][start:end], reveal['prizes'][start:end]
+
+def is_finished(reveal, now=None):
+    """แสดงหน้าสุดท้ายครบ speed วินาทีแล้ว (หรือกดข้าม)"""
+    if reveal['skipped']:
+        return True
+    now = time.time() if now is None else now
+    return now - reveal['started_at'] >= page_count(reveal) * reveal['speed']
@@ -0,0 +1,158 @@
+import itertools
+import os
+
+import openpyxl
+import pandas as pd
+
+import data_store
+import instrumentation
+from draw_state import STATUS_READY, normalize_text
+
+# ----------------------------------------------------
+# *** นำเข้ารายชื่อพนักงาน / ของรางวัล (Excel หรือ CSV) ***
+# ----------------------------------------------------
+# อ่านไฟล์ทีละ CHUNK_ROWS แถว (Excel ใช้ openpyxl แบบ read-only, CSV ใช้ chunksize)
+# ตรวจคอลัมน์ + จัดรูปข้อความ + ตัดรายการซ้ำทีละก้อน แล้วเขียน CSV และ snapshot ครั้งเดียว
+# งานหนักจึงเกิดตอนนำเข้าครั้งเดียว ไม่ใช่ทุกครั้งที่ session โหลดข้อมูล
+
+CHUNK_ROWS = 50_000
+# คอลัมน์รหัสพนักงาน (ถ้ามี) ใช้ตัดรายการซ้ำแทนการเทียบทั้งแถว
+EMPLOYEE_CODE_COLUMN = 'รหัสพนักงาน'
+# แสดงชื่อที่อาจซ้ำ (ชื่อเดียวกันในกลุ่มเดียวกันแต่แถวต่างกัน) ในสรุปผลไม่เกินเท่านี้
+MAX_SUSPECTED = 20
+
+KINDS = {
+    'employees': {
+        'path': data_store.EMPLOYEE_FILE,
+        'required': ['ชื่อ-นามสกุล', 'แผนก', 'กลุ่มจับรางวัล'],
+        'optional': ['สถานะ', EMPLOYEE_CODE_COLUMN],
+        # ซ้ำ = รหัสพนักงานเดียวกัน หรือ (ถ้าไม่มีรหัส) ชื่อ แผนก และกลุ่มตรงกันทั้งหมด
+        # ชื่อซ้ำกันแต่แผนกต่างกันเป็นคนละคน: เก็บไว้และแจ้งเป็นรายการที่อาจซ้ำ
+        'key': ['ชื่อ-นามสกุล', 'แผนก', 'กลุ่มจับรางวัล'],
+    },
+    'prizes': {
+        'path': data_store.PRIZE_FILE,
+        'required': ['ชื่อของขวัญ', 'กลุ่มจับรางวัล', 'จำนวนคงเหลือ'],
+        'optional': [],
+        # ชื่อของขวัญซ้ำได้หลายแถว (จำนวนรวมกัน) จึงไม่ตัดรายการซ้ำ
+        'key': None,
+    },
+}
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+
+# ----------------------------------------------------
+# *** จัดรูปข้อความภาษาไทย (draw_state.normalize_text) ***
+# ----------------------------------------------------
+def _normalize_column(series, collapse=True):
+    # ค่าซ้ำกันมาก (กลุ่ม/แผนก): จัดรูปครั้งเดียวต่อค่าที่ไม่ซ้ำ
+    uniques = series.dropna().unique()
+    mapping = {v: normalize_text(v, collapse) for v in uniques}
+    return series.map(mapping).fillna('')
+
+# ----------------------------------------------------
+# *** อ่านไฟล์ทีละก้อน ***
+# ----------------------------------------------------
+def _iter_excel(file):
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [normalize_text(h) if h is not None else '' for h in header]
+        while True:
+            chunk = list(itertools.islice(rows, CHUNK_ROWS))
+            if not chunk:
+                return
+            yield pd.DataFrame(chunk, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+def _iter_csv(file):
+    encoding = data_store.sniff_encoding(file.read(data_store.SNIFF_BYTES))
+    file.seek(0)
+    try:
+        for chunk in pd.read_csv(file, encoding=encoding, dtype=str, chunksize=CHUNK_ROWS):
+            chunk.columns = [normalize_text(c) for c in chunk.columns]
+            yield chunk
+    except pd.errors.EmptyDataError:
+        return
+
+def iter_chunks(file, filename):
+    """DataFrame ทีละ CHUNK_ROWS แถว จากไฟล์ Excel หรือ CSV (file เป็น path หรือ file object)"""
+    if os.path.splitext(filename)[1].lower() in EXCEL_SUFFIXES:
+        return _iter_excel(file)
+    return _iter_csv(file)
+
+# ----------------------------------------------------
+# *** นำเข้า ***
+# ----------------------------------------------------
+def _normalize_chunk(chunk, spec):
+    # คอลัมน์อื่น (รวมคอลัมน์ว่าง/ไม่มีหัวตาราง) ถูกตัดทิ้งตรงนี้
+    columns = spec['required'] + [c for c in spec['optional'] if c in chunk.columns]
+    chunk = chunk[columns].copy()
+    for col in columns:
+        collapse = col not in ('ชื่อ-นามสกุล', 'ชื่อของขวัญ')
+        chunk[col] = _normalize_column(chunk[col], collapse)
+    if 'จำนวนคงเหลือ' in chunk.columns:
+        chunk['จำนวนคงเหลือ'] = pd.to_numeric(chunk['จำนวนคงเหลือ'], errors='coerce').fillna(0).astype(int)
+    if 'สถานะ' in chunk.columns:
+        chunk['สถานะ'] = chunk['สถานะ'].where(chunk['สถานะ'] != '', STATUS_READY)
+    # แถวที่ไม่มีชื่อหรือไม่มีกลุ่มใช้สุ่มไม่ได้
+    return chunk[(chunk[spec['required'][0]] != '') & (chunk['กลุ่มจับรางวัล'] != '')]
+
+def _drop_duplicates(clean, key_columns, seen, names_seen, summary):
+    """ตัดแถวซ้ำ (ภายในก้อนหรือกับก้อนก่อนหน้า เก็บแถวแรกที่พบ) และจดชื่อที่อาจซ้ำ"""
+    codes = clean[EMPLOYEE_CODE_COLUMN] if EMPLOYEE_CODE_COLUMN in clean.columns else [''] * len(clean)
+    keep = []
+    for code, name, dept, group in zip(codes, *(clean[c] for c in key_columns)):
+        key = ('code', code) if code else ('row', name, dept, group)
+        if key in seen:
+            keep.append(False)
+            continue
+        seen.add(key)
+        keep.append(True)
+        if (name, group) in names_seen:
+            if len(summary['suspected']) < MAX_SUSPECTED and name not in summary['suspected']:
+                summary['suspected'].append(name)
+        names_seen.add((name, group))
+    summary['duplicates'] += keep.count(False)
+    return clean[keep]
+
+@instrumentation.timed('import.roster')
+def import_file(kind, file, filename, path=None):
+    """นำเข้าไฟล์รายชื่อ (kind='employees') หรือของรางวัล (kind='prizes') แล้วเขียนทับไฟล์ข้อมูล
+
+    คืน dict สรุปผล {'ok', 'rows', 'imported', 'skipped', 'duplicates', 'suspected', 'missing'}
+    suspected: ชื่อ (ไม่เกิน MAX_SUSPECTED) ที่มีหลายแถวในกลุ่มเดียวกันแต่ไม่ใช่แถวซ้ำ (นำเข้าทุกแถว)
+    ถ้าคอลัมน์ที่จำเป็นไม่ครบหรือไฟล์ว่าง 'ok' เป็น False และไม่มีการเขียนไฟล์
+    """
+    spec = KINDS[kind]
+    path = path or spec['path']
+    summary = {'ok': False, 'rows': 0, 'imported': 0, 'skipped': 0, 'duplicates': 0, 'suspected': [],
+               'missing': []}
+    seen = set()
+    names_seen = set()
+    parts = []
+    for chunk in iter_chunks(file, filename):
+        missing = [c for c in spec['required'] if c not in chunk.columns]
+        if missing:
+            summary['missing'] = missing
+            return summary
+        summary['rows'] += len(chunk)
+        clean = _normalize_chunk(chunk, spec)
+        summary['skipped'] += len(chunk) - len(clean)
+        if spec['key']:
+            clean = _drop_duplicates(clean, spec['key'], seen, names_seen, summary)
+        parts.append(clean)
+        instrumentation.incr('import.rows', len(chunk))
+
+    if not parts:
+        return summary
+    df = pd.concat(parts, ignore_index=True)
+    if kind == 'employees' and 'สถานะ' not in df.columns:
+        df['สถานะ'] = STATUS_READY
+    summary['imported'] = len(df)
+    summary['ok'] = data_store.save_table(path, df)
+    return summary
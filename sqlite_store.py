@@ -0,0 +1,233 @@
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import data_store
+from draw_state import STATUS_READY, STATUS_WON, match_winners
+
+# ----------------------------------------------------
+# --- CONFIGURATION & FILE PATHS ---
+# ----------------------------------------------------
+DB_FILE = 'draw_state.db'
+# เปิดใช้ด้วย DRAW_STORE=sqlite (ค่าเริ่มต้น: สถานะอยู่ในหน่วยความจำของ process ใน draw_coordinator
+# และกู้คืนจากไฟล์ประวัติเมื่อเริ่มใหม่) เปิดแล้วหลาย process ใช้สถานะชุดเดียวกันได้
+ENABLED = os.environ.get('DRAW_STORE', '').strip().lower() == 'sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    emp_id INTEGER PRIMARY KEY,
+    name   TEXT NOT NULL,
+    dept   TEXT,
+    grp    TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_employees_grp_status ON employees (grp, status);
+
+CREATE TABLE IF NOT EXISTS prizes (
+    prize_id  INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL,
+    grp       TEXT NOT NULL,
+    quantity  INTEGER NOT NULL,
+    remaining INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prizes_grp_name ON prizes (grp, name, remaining);
+
+CREATE TABLE IF NOT EXISTS winners (
+    seq     INTEGER PRIMARY KEY,
+    emp_id  INTEGER NOT NULL,
+    emp_key TEXT,
+    name    TEXT NOT NULL,
+    dept    TEXT,
+    prize_id INTEGER,
+    prize   TEXT NOT NULL,
+    grp     TEXT NOT NULL,
+    seed    INTEGER,
+    draw_no INTEGER,
+    batch   INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_winners_grp ON winners (grp);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# ----------------------------------------------------
+# *** การเชื่อมต่อ (หนึ่ง connection ต่อ thread) ***
+# ----------------------------------------------------
+_local = threading.local()
+
+def connect():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        # isolation_level=None: คุมธุรกรรมเองด้วย BEGIN IMMEDIATE
+        conn = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # FULL: fsync ทุก commit เหมือน journal ของประวัติ (ไม่เสียผู้โชคดีเมื่อเครื่องดับ)
+        conn.execute('PRAGMA synchronous=FULL')
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        _local.conn = conn
+    return conn
+
+def _migrate(conn):
+    # ฐานข้อมูลที่สร้างก่อนมีคอลัมน์ winners.prize_id / winners.emp_key
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(winners)')}
+    if 'prize_id' not in columns:
+        conn.execute('ALTER TABLE winners ADD COLUMN prize_id INTEGER')
+    if 'emp_key' not in columns:
+        conn.execute('ALTER TABLE winners ADD COLUMN emp_key TEXT')
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK เมื่อเกิด exception)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+def _clean(value):
+    return '' if pd.isna(value) else str(value).strip()
+
+# ----------------------------------------------------
+# *** รายชื่อ / ของรางวัล ***
+# ----------------------------------------------------
+def _roster_signature():
+    return repr((data_store.file_signature(data_store.EMPLOYEE_FILE), data_store.file_signature(data_store.PRIZE_FILE)))
+
+def _seed_roster(conn, emp_df, prize_df):
+    conn.execute('DELETE FROM employees')
+    conn.execute('DELETE FROM prizes')
+    if not emp_df.empty:
+        conn.executemany(
+            'INSERT INTO employees (emp_id, name, dept, grp, status) VALUES (?, ?, ?, ?, ?)',
+            ((int(emp_id), _clean(name), _clean(dept), _clean(group), _clean(status) or STATUS_READY)
+             for emp_id, name, dept, group, status in zip(
+                 emp_df.index, emp_df['ชื่อ-นามสกุล'], emp_df.get('แผนก', pd.Series('', index=emp_df.index)),
+                 emp_df['กลุ่มจับรางวัล'], emp_df['สถานะ'])))
+    if not prize_df.empty:
+        conn.executemany(
+            'INSERT INTO prizes (prize_id, name, grp, quantity, remaining) VALUES (?, ?, ?, ?, ?)',
+            # ชื่อของขวัญเก็บตามต้นฉบับ (ไม่ตัดช่องว่าง) ให้ตรงกับค่าที่ run_draw คืนมา
+            ((int(prize_id), '' if pd.isna(name) else str(name), _clean(group), int(qty), int(qty))
+             for prize_id, name, group, qty in zip(
+                 prize_df.index, prize_df['ชื่อของขวัญ'], prize_df['กลุ่มจับรางวัล'], prize_df['จำนวนคงเหลือ'])))
+
+    _restore_winners(conn)
+
+def _restore_winners(conn):
+    """ผู้โชคดีที่บันทึกไว้แล้วยังคงได้รับรางวัลหลังรายชื่อ/ของรางวัลถูกแก้
+
+    พนักงานจับคู่ด้วย draw_state.match_winners (emp_key แล้ว emp_id แล้วชื่อ + กลุ่ม; ชื่อซ้ำจึงไม่ถูกตั้ง
+    เป็นได้รับแล้วทั้งหมด) ของรางวัลใช้ prize_id ถ้าแถวนั้นยังเป็นของเดิม (ชื่อ + กลุ่มตรงกัน)
+    """
+    winners = conn.execute('SELECT emp_key, emp_id, name, grp, prize_id, prize FROM winners ORDER BY seq').fetchall()
+    if not winners:
+        return
+    matched = match_winners([winner[:4] for winner in winners],
+                            conn.execute('SELECT emp_id, name, dept, grp FROM employees ORDER BY emp_id'))
+    conn.executemany('UPDATE employees SET status = ? WHERE emp_id = ?',
+                     ((STATUS_WON, emp_id) for emp_id in matched if emp_id is not None))
+
+    for _, _, _, grp, prize_id, prize in winners:
+        cur = conn.execute('UPDATE prizes SET remaining = remaining - 1 '
+                           'WHERE prize_id = ? AND grp = ? AND name = ? AND remaining > 0', (prize_id, grp, prize))
+        if cur.rowcount != 1:
+            _take_prize(conn, grp, prize)
+
+def sync_roster(emp_df, prize_df):
+    """สร้างตารางพนักงาน/ของรางวัลจาก DataFrame ครั้งแรก หรือเมื่อไฟล์ employees/prizes เปลี่ยน"""
+    signature = _roster_signature()
+    with _transaction(connect()) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'roster'").fetchone()
+        if row is not None and row[0] == signature:
+            return
+        _seed_roster(conn, emp_df, prize_df)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('roster', ?)", (signature,))
+
+def apply_state(emp_df, prize_df):
+    """เขียนสถานะพนักงานและจำนวนคงเหลือจากฐานข้อมูลทับลงใน DataFrame (แก้ในที่)"""
+    conn = connect()
+    if not emp_df.empty:
+        status = dict(conn.execute('SELECT emp_id, status FROM employees').fetchall())
+        emp_df['สถานะ'] = data_store.status_categorical(
+            [status.get(int(emp_id), current) for emp_id, current in zip(emp_df.index, emp_df['สถานะ'])])
+    if not prize_df.empty:
+        remaining = dict(conn.execute('SELECT prize_id, remaining FROM prizes').fetchall())
+        prize_df['จำนวนคงเหลือ'] = [remaining.get(int(prize_id), current)
+                                   for prize_id, current in zip(prize_df.index, prize_df['จำนวนคงเหลือ'])]
+
+# ----------------------------------------------------
+# *** บันทึกผู้โชคดี (หนึ่งธุรกรรมต่อชุด) ***
+# ----------------------------------------------------
+def _take_prize(conn, group, prize):
+    """ลดของรางวัลชื่อ prize ของกลุ่มลง 1 จากแถวแรกที่ยังเหลือ คืน prize_id หรือ None ถ้าหมด"""
+    row = conn.execute('SELECT prize_id FROM prizes WHERE grp = ? AND name = ? AND remaining > 0 '
+                       'ORDER BY prize_id LIMIT 1', (_clean(group), prize)).fetchone()
+    if row is None:
+        return None
+    conn.execute('UPDATE prizes SET remaining = remaining - 1 WHERE prize_id = ?', row)
+    return row[0]
+
+class _Conflict(Exception):
+    pass
+
+def _int_or_none(value):
+    return None if value is None or pd.isna(value) else int(value)
+
+def next_draw_no(minimum=0):
+    """ลำดับรอบการสุ่มถัดไปที่ไม่ซ้ำกันทุก process (อย่างน้อย minimum)"""
+    with _transaction(connect()) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'draw_no'").fetchone()
+        draw_no = max(int(row[0]) if row is not None else 0, int(minimum))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('draw_no', ?)", (str(draw_no + 1),))
+    return draw_no
+
+def commit_winners(emp_ids, records, persist):
+    """บันทึกผู้โชคดี: เปลี่ยนสถานะพนักงาน ลดจำนวนของรางวัล และเพิ่มประวัติในธุรกรรมเดียว
+
+    ลำดับในประวัติ (seq) ต่อจากผู้โชคดีล่าสุดของทุก process และคำนวณภายในธุรกรรม
+    persist(start_seq) เขียนไฟล์ประวัติก่อน COMMIT: ทุก process จึงเขียนไฟล์ทีละรายภายใต้ lock ของฐานข้อมูล
+    คืน start_seq หรือ None (ไม่บันทึกอะไรเลย) ถ้ามีพนักงานที่ได้รับรางวัลไปแล้วหรือของรางวัลหมด
+    """
+    conn = connect()
+    try:
+        with _transaction(conn):
+            start_seq = conn.execute('SELECT COALESCE(MAX(seq) + 1, 0) FROM winners').fetchone()[0]
+            for offset, (emp_id, record) in enumerate(zip(emp_ids, records)):
+                cur = conn.execute('UPDATE employees SET status = ? WHERE emp_id = ? AND status = ?',
+                                   (STATUS_WON, int(emp_id), STATUS_READY))
+                if cur.rowcount != 1:
+                    raise _Conflict()
+                prize_id = _take_prize(conn, record['กลุ่มจับรางวัล'], record['รายการของขวัญ'])
+                if prize_id is None:
+                    raise _Conflict()
+                conn.execute(
+                    'INSERT INTO winners (seq, emp_id, emp_key, name, dept, prize_id, prize, grp, seed, draw_no, batch) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (start_seq + offset, int(emp_id), record.get('_emp_key'), _clean(record['ชื่อ-นามสกุล']), _clean(record.get('แผนก')),
+                     prize_id, record['รายการของขวัญ'], _clean(record['กลุ่มจับรางวัล']),
+                     _int_or_none(record.get('_seed')), _int_or_none(record.get('_draw_no')),
+                     _int_or_none(record.get('_batch'))))
+            persist(start_seq)
+    except _Conflict:
+        return None
+    return start_seq
+
+def reset(emp_df, prize_df):
+    """ล้างประวัติ: ลบผู้โชคดีทั้งหมดแล้วตั้งสถานะ/จำนวนคงเหลือตาม DataFrame ใหม่"""
+    with _transaction(connect()) as conn:
+        conn.execute('DELETE FROM winners')
+        conn.execute("DELETE FROM meta WHERE key = 'draw_no'")
+        _seed_roster(conn, emp_df, prize_df)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('roster', ?)",
+                     (_roster_signature(),))
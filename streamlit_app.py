@@ -1,11 +1,16 @@
 import streamlit as st
-import pandas as pd
-import random
 import time
-import io
 import os
-import base64
+import hashlib
+import html
 import warnings
+from PIL import Image
+
+import data_store
+import draw_coordinator
+import instrumentation
+import qr_assets
+import reveal_player
 
 # ป้องกัน UserWarning จาก openpyxl
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
@@ -13,70 +18,86 @@ warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 # ----------------------------------------------------
 # --- CONFIGURATION & FILE PATHS ---
 # ----------------------------------------------------
-HISTORY_FILE = 'draw_history.csv'
-EMPLOYEE_FILE = 'employees.csv'
-PRIZE_FILE = 'prizes.csv'
+# รูปพื้นหลังเสิร์ฟแบบ static file (ดู .streamlit/config.toml: enableStaticServing)
+BACKGROUND_FILE = 'static/background.jpg'
+BACKGROUND_MAX_SIZE = (1920, 1080)
+# fragment เปิดเผยผู้โชคดีรีเฟรชถี่ไม่เกินนี้ (วินาที) แม้ตั้งความเร็วต่ำกว่า
+REVEAL_MIN_TICK = 0.1
+# จำนวนผู้โชคดีต่อหน้าเริ่มต้นของโหมดแสดงทีละหน้า
+REVEAL_PAGE_SIZE = 20
 
 # ----------------------------------------------------
 # --- FUNCTIONS ---
 # ----------------------------------------------------
 
-def save_history(history_list):
-    required_cols = ['ชื่อ-นามสกุล', 'แผนก', 'รายการของขวัญ', 'กลุ่มจับรางวัล']
-    df_history = pd.DataFrame(history_list) if history_list else pd.DataFrame(columns=required_cols)
+@st.cache_data(show_spinner=False)
+def _file_digest(path, mtime_ns, size):
+    # cache ตาม (mtime, size) ของไฟล์: hash ใหม่เฉพาะเมื่อไฟล์ถูกแทนที่
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+def get_background_url(image_file=BACKGROUND_FILE):
+    """URL ของรูปพื้นหลังแบบ static พร้อม ?v=<hash> ให้เบราว์เซอร์ cache ได้จนกว่ารูปจะเปลี่ยน"""
     try:
-        df_history.to_csv(HISTORY_FILE, index=False, encoding='utf_8_sig')
-    except Exception as e:
-        print(f"ERROR: {e}")
+        stat = os.stat(image_file)
+    except OSError:
+        return None
+    digest = _file_digest(image_file, stat.st_mtime_ns, stat.st_size)
+    return f"app/{image_file}?v={digest}"
 
-def load_data(emp_file=EMPLOYEE_FILE, prize_file=PRIZE_FILE):
-    employee_data = pd.DataFrame()
-    prize_data = pd.DataFrame()
-    
-    if os.path.exists(emp_file):
-        for enc in ['utf-8-sig', 'cp874', 'utf-8']:
-            try:
-                employee_data = pd.read_csv(emp_file, encoding=enc)
-                break
-            except: continue
-    
-    if os.path.exists(prize_file):
-        for enc in ['utf-8-sig', 'cp874', 'utf-8']:
-            try:
-                prize_data = pd.read_csv(prize_file, encoding=enc)
-                break
-            except: continue
-
-    if not employee_data.empty and 'สถานะ' not in employee_data.columns:
-        employee_data['สถานะ'] = 'พร้อมสุ่ม'
-    
-    if not prize_data.empty:
-        prize_data['จำนวนคงเหลือ'] = pd.to_numeric(prize_data['จำนวนคงเหลือ'], errors='coerce').fillna(0).astype(int)
-        
-    return employee_data, prize_data
+def save_background(upload, image_file=BACKGROUND_FILE):
+    """ย่อรูปที่ใหญ่เกิน BACKGROUND_MAX_SIZE และบีบอัดเป็น JPEG ก่อนบันทึก"""
+    img = Image.open(upload).convert("RGB")
+    img.thumbnail(BACKGROUND_MAX_SIZE)
+    tmp_file = image_file + ".tmp"
+    img.save(tmp_file, format="JPEG", quality=85, optimize=True, progressive=True)
+    os.replace(tmp_file, image_file)
 
-def run_draw(group, emp_df, prize_df):
-    group_clean = str(group).strip()
-    available_employees = emp_df[(emp_df['กลุ่มจับรางวัล'] == group_clean) & (emp_df['สถานะ'] == 'พร้อมสุ่ม')]
-    available_prizes = prize_df[(prize_df['กลุ่มจับรางวัล'] == group_clean) & (prize_df['จำนวนคงเหลือ'] > 0)]
-    
-    prize_list = []
-    for _, row in available_prizes.iterrows():
-        prize_list.extend([row['ชื่อของขวัญ']] * row['จำนวนคงเหลือ'])
-        
-    max_draws = min(len(available_employees), len(prize_list))
-    if max_draws == 0: return []
-        
-    selected_employees = available_employees[['ชื่อ-นามสกุล', 'แผนก']].sample(max_draws).values.tolist()
-    selected_prizes = random.sample(prize_list, max_draws)
-    return list(zip(selected_employees, selected_prizes))
+def active_reveal():
+    """(draw_no, reveal) ที่กำลังเปิดเผยอยู่ตาม ?reveal= ใน URL (อยู่รอดแม้ browser reconnect)"""
+    draw_no = st.query_params.get('reveal', '')
+    reveal = reveal_player.get(int(draw_no)) if draw_no.isdigit() else None
+    if reveal is None or reveal_player.is_finished(reveal):
+        if reveal is not None:
+            st.session_state.finished_group = reveal['group']
+        st.query_params.pop('reveal', None)
+        return None, None
+    return int(draw_no), reveal
 
-def get_base64_image(image_file):
-    try:
-        with open(image_file, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
-        return f"data:image/jpg;base64,{data}"
-    except: return None
+def render_reveal_grid(start, names, prizes):
+    """HTML หนึ่งก้อนของผู้โชคดีทั้งหน้า (ส่งไปเบราว์เซอร์เป็น element เดียว)"""
+    cards = []
+    for i, (name, prize) in enumerate(zip(names, prizes), start=start + 1):
+        cards.append(f"""
+        <div class="reveal-card">
+            <span class="reveal-rank">#{i}</span>
+            <span class="reveal-name">{html.escape(str(name))}</span>
+            <span class="reveal-prize">🎁 {html.escape(str(prize))}</span>
+        </div>""")
+    return f'<div class="reveal-grid">{"".join(cards)}</div>'
+
+def play_reveal(draw_no):
+    """แสดงผู้โชคดีคนล่าสุดตามเวลา (เรียกผ่าน st.fragment(run_every=...) ไม่บล็อก script)"""
+    reveal = reveal_player.get(draw_no)
+    if reveal is None or reveal_player.is_finished(reveal):
+        # จบแล้ว: rerun ทั้งหน้า (active_reveal ล้าง ?reveal= และแสดงข้อความสรุป)
+        st.rerun()
+    start, names, prizes = reveal_player.current_page(reveal)
+    total = len(reveal['names'])
+    end = start + len(names)
+    if reveal['page_size'] == 1:
+        st.markdown(f"""
+        <div class='success-box'>
+            <span style='font-size:2.2em;'>🎊 ผู้โชคดีคนที่ {end} 🎊</span>
+            <span class='winner-name-text'>{html.escape(str(names[0]))}</span>
+            <span class='prize-text'>ของรางวัล: {html.escape(str(prizes[0]))}</span>
+        </div>
+        """, unsafe_allow_html=True)
+        st.progress(end / total, text=f"{end} / {total}")
+    else:
+        st.markdown(render_reveal_grid(start, names, prizes), unsafe_allow_html=True)
+        st.progress(end / total, text=f"ผู้โชคดีคนที่ {start + 1}-{end} จาก {total}")
+    st.button("⏭️ ข้ามไปคนสุดท้าย", key=f"skip_reveal_{draw_no}", on_click=reveal_player.skip, args=(draw_no,))
 
 # ----------------------------------------------------
 # --- Main Program ---
@@ -84,12 +105,16 @@ def get_base64_image(image_file):
 def main():
     st.set_page_config(layout="wide", page_title="สุ่มจับรางวัลปีใหม่ 2569")
 
-    if 'emp_df' not in st.session_state:
-        st.session_state.emp_df, st.session_state.prize_df = load_data()
-        st.session_state.draw_history = []
-        if os.path.exists(HISTORY_FILE):
-            try: st.session_state.draw_history = pd.read_csv(HISTORY_FILE).to_dict('records')
-            except: pass
+    # รายชื่อ/ของรางวัล/ประวัติใช้ร่วมกันทุก session (ดู draw_coordinator)
+    state = draw_coordinator.get_state()
+    reveal_no, reveal = active_reveal()
+    if reveal is not None:
+        # โหลดหน้าใหม่ระหว่างเปิดเผย: กลับไปที่กลุ่มเดิมแล้วเล่นต่อจากตำแหน่งตามเวลา
+        st.session_state.setdefault('selected_group', reveal['group'])
+    if 'qr_ready' not in st.session_state:
+        # สร้าง QR ของหน้าผลรางวัลทุกกลุ่มไว้ก่อน (cache ระดับ process + ดิสก์)
+        qr_assets.pregenerate(qr_assets.group_page_url(g) for g in data_store.load_group_names())
+        st.session_state.qr_ready = True
 
     # --- SIDEBAR ---
     with st.sidebar:
@@ -98,25 +123,42 @@ def main():
         
         st.markdown("### 🖼️ พื้นหลัง")
         bg_upload = st.file_uploader("อัปโหลดรูปพื้นหลังใหม่", type=['jpg', 'jpeg', 'png'])
-        if bg_upload:
-            with open("background.jpg", "wb") as f:
-                f.write(bg_upload.getbuffer())
+        # file_uploader ยังถือไฟล์เดิมหลัง rerun: บันทึกเฉพาะไฟล์ที่ยังไม่เคยบันทึก
+        if bg_upload and st.session_state.get('bg_upload_id') != bg_upload.file_id:
+            save_background(bg_upload)
+            st.session_state.bg_upload_id = bg_upload.file_id
             st.success("บันทึกรูปพื้นหลังแล้ว!")
             time.sleep(1)
             st.rerun()
 
         st.markdown("### ⏱️ ความเร็วการสุ่ม")
         speed_control = st.slider("ระยะเวลาแสดงผล (วินาที)", 0.01, 2.0, 0.03, 0.01)
+        reveal_mode = st.radio("รูปแบบการแสดงผล", ["ทีละคน", "ทีละหน้า (ตาราง)"], horizontal=True)
+        page_size = 1
+        if reveal_mode != "ทีละคน":
+            page_size = st.slider("จำนวนผู้โชคดีต่อหน้า", 4, 60, REVEAL_PAGE_SIZE, 4)
+            st.caption("ระยะเวลาแสดงผลนับต่อหน้า")
+
+        st.markdown("### 🎲 Seed ของงาน")
+        # seed ใช้ร่วมกันทุกเครื่อง: เปลี่ยนเฉพาะเมื่อผู้ใช้แก้ค่าในช่องนี้
+        current_seed = str(state.event_seed)
+        seed_text = st.text_input("ใช้สุ่มซ้ำ/ตรวจสอบผลย้อนหลัง (บันทึกไว้ในประวัติ)", current_seed).strip()
+        if seed_text != current_seed:
+            if seed_text.isdigit():
+                draw_coordinator.set_event_seed(int(seed_text))
+            else:
+                st.warning("Seed ต้องเป็นตัวเลขเท่านั้น")
         
+        st.markdown("### 🩺 ตรวจสอบประสิทธิภาพ")
+        st.checkbox("Profile การทำงานของหน้านี้ (ดูผลที่หน้า Admin)", key='profile_run')
+
         if st.button("🔴 ล้างประวัติการสุ่มทั้งหมด", use_container_width=True):
-            if os.path.exists(HISTORY_FILE): os.remove(HISTORY_FILE)
-            st.session_state.draw_history = []
-            st.session_state.emp_df, st.session_state.prize_df = load_data()
+            draw_coordinator.clear_history()
             st.cache_data.clear()
             st.rerun()
 
     # --- CSS STYLES (ปรับขนาดตัวอักษร Alert ให้ใหญ่ขึ้น) ---
-    bg_img = get_base64_image('background.jpg')
+    bg_img = get_background_url()
     bg_css = f"background-image: url('{bg_img}'); background-size: cover;" if bg_img else "background-color: #0e1117;"
     
     st.markdown(f"""
@@ -162,6 +204,22 @@ def main():
         .winner-name-text {{ font-size: 4.5em; color: #ffeb3b; font-weight: bold; display: block; }}
         .prize-text {{ font-size: 2.8em; color: #ffffff; display: block; }}
         
+        .reveal-grid {{
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
+            gap: 12px;
+            margin: 20px auto;
+        }}
+        .reveal-card {{
+            background-color: #1a5631;
+            border-left: 6px solid #48a964;
+            border-radius: 10px;
+            padding: 12px 14px;
+        }}
+        .reveal-rank {{ color: #c9c9c9; font-size: 0.9em; display: block; }}
+        .reveal-name {{ color: #ffeb3b; font-size: 1.4em; font-weight: bold; display: block; }}
+        .reveal-prize {{ color: #ffffff; font-size: 1.0em; display: block; }}
+        
         .stButton {{ display: flex; justify-content: center; }}
         .stButton>button[key="main_draw_btn"] {{
             background-color: #ff4b4b !important;
@@ -177,8 +235,9 @@ def main():
     st.markdown("---")
 
     # --- Group Selection ---
-    if not st.session_state.emp_df.empty:
-        groups = [g for g in st.session_state.emp_df['กลุ่มจับรางวัล'].unique() if pd.notna(g)]
+    batch_click = False
+    if state.groups:
+        groups = state.groups
         _, col_mid, _ = st.columns([1, 8, 1])
         with col_mid:
             st.markdown("<p style='text-align:center; font-size:1.5em;'>🎯 เลือกกลุ่มจับรางวัล</p>", unsafe_allow_html=True)
@@ -187,54 +246,63 @@ def main():
                 with inner_cols[i]:
                     if st.button(group, key=f"btn_{group}", use_container_width=True):
                         st.session_state.selected_group = group
+                    # จำนวนจาก pool ที่เตรียมไว้ (ไม่ต้องกรองตาราง)
+                    eligible, remaining = state.draw_state.counts(group)
+                    st.caption(f"พร้อมสุ่ม {eligible:,} คน / เหลือ {remaining:,} รางวัล")
+            batch_click = st.button("🎲 สุ่มทุกกลุ่มพร้อมกัน", key="batch_draw_btn", use_container_width=True)
     
     st.markdown("---")
 
+    # --- Batch Draw UI (ทุกกลุ่มในรอบเดียว) ---
+    if batch_click:
+        results = draw_coordinator.draw_all()
+        if results is None:
+            st.warning("มีการบันทึกผู้โชคดีจากเครื่องอื่นพร้อมกัน กรุณากดสุ่มอีกครั้ง")
+        elif not results.empty:
+            st.balloons()
+            st.success(f"🎉 สุ่มครบทุกกลุ่มแล้ว รวม {len(results)} รางวัล")
+            for g, df_group in results.groupby('กลุ่มจับรางวัล', sort=False):
+                st.markdown(f"### 🎯 {g} ({len(df_group)} รางวัล)")
+                st.dataframe(df_group[['ชื่อ-นามสกุล', 'แผนก', 'รายการของขวัญ']], hide_index=True, use_container_width=True)
+        else:
+            st.error("ไม่มีพนักงานหรือของรางวัลเหลือในทุกกลุ่ม")
+
     # --- Draw UI ---
-    if st.session_state.get('selected_group'):
+    elif st.session_state.get('selected_group'):
         group = st.session_state.selected_group
         _, col_draw, _ = st.columns([1, 1.5, 1])
         with col_draw:
             st.markdown(f"<p style='text-align:center; font-size:1.3em;'>พร้อมสุ่มกลุ่ม: <b>{group}</b></p>", unsafe_allow_html=True)
-            draw_click = st.button(f"🔴 เริ่มสุ่ม {group}", key="main_draw_btn", use_container_width=True)
-
-        display_area = st.empty()
+            draw_click = st.button(f"🔴 เริ่มสุ่ม {group}", key="main_draw_btn", use_container_width=True,
+                                   disabled=reveal is not None)
 
         if draw_click:
-            results = run_draw(group, st.session_state.emp_df, st.session_state.prize_df)
-            if results:
+            # บันทึกผลทั้งกลุ่มก่อน (เครื่องอื่นจะไม่ได้พนักงาน/ของรางวัลซ้ำ) แล้วค่อยเปิดเผยทีละคน
+            results = draw_coordinator.draw_group(group)
+            if results is None:
+                st.warning("มีการบันทึกผู้โชคดีจากเครื่องอื่นพร้อมกัน กรุณากดสุ่มอีกครั้ง")
+            elif not results.empty:
+                reveal_no = int(results['_draw_no'].iloc[0])
+                reveal_player.start(reveal_no, group, results['ชื่อ-นามสกุล'], results['รายการของขวัญ'],
+                                    speed_control, page_size)
+                reveal = reveal_player.get(reveal_no)
+                st.query_params['reveal'] = str(reveal_no)
                 st.balloons()
-                for i, item in enumerate(results):
-                    (w_name, w_dept), prize = item
-                    with display_area.container():
-                        st.markdown(f"""
-                        <div class='success-box'>
-                            <span style='font-size:2.2em;'>🎊 ผู้โชคดีคนที่ {i+1} 🎊</span>
-                            <span class='winner-name-text'>{w_name}</span>
-                            <span class='prize-text'>ของรางวัล: {prize}</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    idx_emp = st.session_state.emp_df.index[st.session_state.emp_df['ชื่อ-นามสกุล'] == w_name].tolist()
-                    if idx_emp: st.session_state.emp_df.at[idx_emp[0], 'สถานะ'] = 'ได้รับแล้ว'
-                    
-                    idx_prz = st.session_state.prize_df.index[(st.session_state.prize_df['ชื่อของขวัญ'] == prize) & (st.session_state.prize_df['กลุ่มจับรางวัล'] == group)].tolist()
-                    if idx_prz: st.session_state.prize_df.at[idx_prz[0], 'จำนวนคงเหลือ'] -= 1
-                    
-                    st.session_state.draw_history.append({'ชื่อ-นามสกุล': w_name, 'แผนก': w_dept, 'รายการของขวัญ': prize, 'กลุ่มจับรางวัล': group})
-                    save_history(st.session_state.draw_history)
-                    time.sleep(speed_control)
-                
-                display_area.empty()
-                st.success(f"🎉 เสร็จสิ้นการสุ่มกลุ่ม   ***  {group}  ***  ตรวจเช็คของขวัญที่ท่านได้รับได้ที่บูธของขวัญ")
             else:
                 st.error("ไม่มีพนักงานหรือของรางวัลเหลือในกลุ่มนี้")
+
+        if reveal is not None and reveal['group'] == group:
+            st.fragment(play_reveal, run_every=max(reveal['speed'], REVEAL_MIN_TICK))(reveal_no)
+        elif st.session_state.pop('finished_group', None) == group:
+            st.success(f"🎉 เสร็จสิ้นการสุ่มกลุ่ม   ***  {group}  ***  ตรวจเช็คของขวัญที่ท่านได้รับได้ที่บูธของขวัญ")
     else:
         # แถบนี้จะอยู่ตรงกลางและตัวอักษรใหญ่
         st.info("กรุณาเลือกกลุ่มด้านบนเพื่อเริ่มจับรางวัล")
 
 if __name__ == '__main__':
-    main()
+    # เวลาทั้ง script run (รวมการส่ง element ให้ Streamlit) + profiler ที่เปิดจาก sidebar
+    with instrumentation.timer('render.main'), instrumentation.profile(st.session_state.get('profile_run', False)):
+        main()
 
 
 